@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class ChatWriteQueue:
+    """Write-behind persistence for chat history.
+
+    Requests enqueue validated rows and return immediately; a single background
+    thread drains the queue and writes up to ``batch_size`` rows per multi-row
+    INSERT and commit. If a batch fails its rows are written one at a time,
+    each retried up to ``row_retries`` times, so one bad row only loses
+    itself. The queue is bounded: when it is full new rows are dropped and
+    counted instead of growing memory without limit. stop() flushes whatever
+    is still queued.
+    """
+
+    def __init__(self, db_manager, max_queue: int = 10000, batch_size: int = 100,
+                 flush_interval: float = 0.5, row_retries: int = 2):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.row_retries = row_retries
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed_rows = 0
+        self.failed_batches = 0
+        self.last_error: Optional[str] = None
+        self.last_flush_ms = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, row: tuple) -> bool:
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            print("⚠️ Chat write queue full, dropping chat history row")
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _take_batch(self, timeout: float) -> List[tuple]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_row(self, row: tuple) -> bool:
+        for attempt in range(self.row_retries + 1):
+            try:
+                self.db_manager.save_chats([row])
+                return True
+            except Exception as e:
+                error = e
+                if attempt < self.row_retries:
+                    time.sleep(0.05 * 2 ** attempt)
+        with self._lock:
+            self.failed_rows += 1
+            self.last_error = str(error)
+        print(f"⚠️ Failed to write chat row after {self.row_retries + 1} attempts: {str(error)}")
+        return False
+
+    def _write(self, batch: List[tuple]):
+        started = time.monotonic()
+        try:
+            self.db_manager.save_chats(batch)
+            written = len(batch)
+        except Exception as e:
+            with self._lock:
+                self.failed_batches += 1
+                self.last_error = str(e)
+            print(f"⚠️ Failed to write {len(batch)} chat rows, retrying row by row: {str(e)}")
+            written = sum(self._write_row(row) for row in batch)
+        with self._lock:
+            self.written += written
+            self.batches += 1
+            self.last_flush_ms = round((time.monotonic() - started) * 1000, 3)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+        # Final flush on shutdown
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                break
+            self._write(batch)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failed_rows": self.failed_rows,
+                "failed_batches": self.failed_batches,
+                "last_error": self.last_error,
+                "last_flush_ms": self.last_flush_ms,
+            }
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -13,6 +14,77 @@ class Settings(BaseSettings):
     db_password: str = os.getenv("DB_PASSWORD")
     db_name: str = os.getenv("DB_NAME")
     db_timeout: int = 30
+    db_pool_size: int = 5
+    db_pool_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: float = 3600
+    db_pool_idle_timeout: float = 300
+    db_pool_pre_ping: bool = True
+    query_batch_size: int = 500
+    query_max_rows: int = 10000
+    query_max_bytes: int = 50 * 1024 * 1024
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 512
+    query_cache_max_bytes: int = 64 * 1024 * 1024
+    query_cache_ttl: float = 300  # backstop when the table's UPDATE_TIME is reported lazily
+    query_cache_check_interval: float = 10
+    dashboard_point_budget: int = 5000  # max points sent to the browser per chart
+    dashboard_line_downsampling: str = "lttb"  # "lttb" or "minmax"
+    dashboard_result_cache_max_bytes: int = 256 * 1024 * 1024  # server-side frames behind the data table
+    dashboard_result_cache_ttl: float = 1800
+    dashboard_snapshot_enabled: bool = False  # serve the dashboard from an in-memory columnar copy of students
+    dashboard_snapshot_key_column: str = "id"
+    dashboard_snapshot_updated_column: Optional[str] = "updated_at"  # used for incremental refresh when present
+    dashboard_snapshot_check_interval: float = 10
+    dashboard_snapshot_batch_size: int = 50000
+    sql_max_limit: int = 10000  # LIMIT injected into / capped on generated queries
+    sql_max_examined_rows: int = 10000000  # EXPLAIN estimate above which generated queries are rejected
+    sql_max_cost: Optional[float] = None
+    sql_max_execution_ms: int = 30000
+    chat_write_queue_size: int = 10000
+    chat_write_batch_size: int = 100
+    chat_write_flush_interval: float = 0.5
+    chat_write_row_retries: int = 2
+    history_page_size: int = 50
+    history_max_page_size: int = 500
+    chat_results_max_rows: int = 1000
+    chat_results_compression: Optional[str] = "zlib"  # "zstd" (needs zstandard), "zlib" or None
+    schema_cache_ttl: float = 600
+    schema_check_interval: float = 30
+    sql_cache_enabled: bool = True
+    sql_cache_max_entries: int = 2048
+    sql_cache_ttl: float = 24 * 3600
+    sql_cache_path: Optional[str] = None  # e.g. "cache/sql_cache.sqlite3" to persist across restarts
+    sql_cache_disk_max_entries: int = 50000
+    explanation_cache_enabled: bool = True
+    explanation_cache_max_entries: int = 2048
+    explanation_cache_max_bytes: int = 8 * 1024 * 1024  # characters of cached explanation text
+    explanation_cache_ttl: float = 3600
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_max_entries: int = 5000
+    semantic_cache_model: Optional[str] = None  # sentence-transformers model name; hashing embedder when unset
+    template_sql_enabled: bool = True
+    template_sql_default_limit: int = 10
+    template_sql_max_limit: int = 1000
+    stream_row_chunk_size: int = 200
+    explanation_token_budget: int = 1500
+    explanation_sample_rows: int = 10
+    local_llm_url: str = "http://localhost:1234/v1"
+    http_pool_connections: int = 4  # distinct hosts kept per requests session
+    http_pool_maxsize: int = 20  # keep-alive connections per host
+    http_keepalive_expiry: float = 30
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_timeout: float = 30
+    llm_timeout_min: float = 5
+    llm_timeout_max: float = 120
+    llm_timeout_multiplier: float = 3  # adaptive timeout = p99 latency * multiplier
+    llm_latency_window: int = 200
+    llm_latency_min_samples: int = 20
+    llm_hedging_enabled: bool = True
+    llm_hedge_percentile: float = 0.95
+    llm_fallback_providers: str = ""  # e.g. "cohere,gemini,local": tried in order when the requested provider fails
+    race_providers: str = "cohere,gemini,local"  # providers raced when provider == "race"
 
     @property
     def db_config(self):
@@ -23,7 +95,34 @@ class Settings(BaseSettings):
             'database': self.db_name,
             'connect_timeout': self.db_timeout,
             'pool_name': 'fraud_detection_pool',
-            'pool_size': 5
+            'pool_size': self.db_pool_size,
+            'max_overflow': self.db_pool_max_overflow,
+            'pool_timeout': self.db_pool_timeout,
+            'pool_recycle': self.db_pool_recycle,
+            'idle_timeout': self.db_pool_idle_timeout,
+            'pre_ping': self.db_pool_pre_ping,
+            'query_batch_size': self.query_batch_size,
+            'query_max_rows': self.query_max_rows,
+            'query_max_bytes': self.query_max_bytes,
+            'query_cache_enabled': self.query_cache_enabled,
+            'query_cache_max_entries': self.query_cache_max_entries,
+            'query_cache_max_bytes': self.query_cache_max_bytes,
+            'query_cache_ttl': self.query_cache_ttl,
+            'query_cache_check_interval': self.query_cache_check_interval,
+            'sql_max_limit': self.sql_max_limit,
+            'sql_max_examined_rows': self.sql_max_examined_rows,
+            'sql_max_cost': self.sql_max_cost,
+            'sql_max_execution_ms': self.sql_max_execution_ms,
+            'chat_write_queue_size': self.chat_write_queue_size,
+            'chat_write_batch_size': self.chat_write_batch_size,
+            'chat_write_flush_interval': self.chat_write_flush_interval,
+            'chat_write_row_retries': self.chat_write_row_retries,
+            'history_page_size': self.history_page_size,
+            'history_max_page_size': self.history_max_page_size,
+            'chat_results_max_rows': self.chat_results_max_rows,
+            'chat_results_compression': self.chat_results_compression,
+            'schema_cache_ttl': self.schema_cache_ttl,
+            'schema_check_interval': self.schema_check_interval
         }
 
 settings = Settings()
\ No newline at end of file
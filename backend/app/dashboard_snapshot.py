@@ -0,0 +1,294 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint", "decimal", "numeric", "float", "double", "real", "bit", "year"}
+DATE_TYPES = {"date", "datetime", "timestamp"}
+TEXT_TYPES = {"char", "varchar", "tinytext", "text", "mediumtext", "longtext", "enum", "set"}
+
+# Dashboard aggregation name -> pandas reducer
+AGGREGATIONS = {"count": "count", "avg": "mean", "sum": "sum", "max": "max", "min": "min", "std": "std"}
+
+
+def _quote(column: str) -> str:
+    return f"`{column}`"
+
+
+class ColumnarSnapshot:
+    """Typed, columnar in-memory copy of the students columns the dashboard uses.
+
+    Numeric columns are float64/int64 arrays, dates datetime64 and strings
+    categorical codes, held in one DataFrame indexed by the primary key.
+    Columns are loaded the first time they are requested. When the table's
+    CREATE_TIME/UPDATE_TIME marker changes (checked at most every
+    ``check_interval`` seconds) the snapshot catches up incrementally: rows
+    whose ``updated_column`` moved forward are upserted when the table has
+    one, otherwise rows past the highest primary key are appended. A row
+    count mismatch, or a change that appended nothing, forces a full reload.
+    Refreshes build a new frame and swap it in. Only callers asking for
+    columns that are not loaded yet wait for the load; a due marker check or
+    catch-up runs in whichever caller takes the lock first while the others
+    keep reading the current frame.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        table: str = "students",
+        key_column: str = "id",
+        updated_column: Optional[str] = "updated_at",
+        check_interval: float = 10,
+        batch_size: int = 50000,
+    ):
+        self.db_manager = db_manager
+        self.table = table
+        self.key_column = key_column
+        self.updated_column = updated_column
+        self.check_interval = check_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._types: Dict[str, str] = {}
+        self._marker = None
+        self._checked_at = 0.0
+        self._max_key = None
+        self._max_updated = None
+
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.rows_loaded = 0
+        self.last_refresh_ms = 0.0
+
+    # Loading
+
+    def _column_types(self) -> Dict[str, str]:
+        return {name: str(data_type).lower() for name, data_type, _ in self.db_manager.schema_cache.get_columns()}
+
+    def _convert(self, frame: pd.DataFrame) -> pd.DataFrame:
+        for column in frame.columns:
+            data_type = self._types.get(column, "")
+            if data_type in NUMERIC_TYPES:
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+            elif data_type in DATE_TYPES:
+                frame[column] = pd.to_datetime(frame[column], errors="coerce")
+            elif data_type in TEXT_TYPES:
+                frame[column] = frame[column].astype("category")
+        return frame
+
+    def _fetch(self, columns: List[str], condition: str = "", params: tuple = ()) -> pd.DataFrame:
+        """Keyset-paginated read of ``columns`` (plus the key) for rows matching ``condition``."""
+        select = ", ".join(_quote(c) for c in [self.key_column] + [c for c in columns if c != self.key_column])
+        frames, last_key = [], None
+        while True:
+            conditions = [condition] if condition else []
+            page_params = params
+            if last_key is not None:
+                conditions.append(f"{_quote(self.key_column)} > %s")
+                page_params = params + (last_key,)
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
+            rows = self.db_manager.execute_query(
+                f"SELECT {select} FROM {_quote(self.table)}{where} "
+                f"ORDER BY {_quote(self.key_column)} LIMIT {self.batch_size}",
+                page_params or None,
+                max_rows=self.batch_size
+            )
+            if not rows:
+                break
+            frames.append(pd.DataFrame(rows))
+            last_key = rows[-1][self.key_column]
+        self.rows_loaded += sum(len(f) for f in frames)
+        if not frames:
+            return pd.DataFrame(columns=[self.key_column] + columns).set_index(self.key_column)
+        return self._convert(pd.concat(frames, ignore_index=True)).set_index(self.key_column)
+
+    def _count(self) -> int:
+        rows = self.db_manager.execute_query(f"SELECT COUNT(*) AS n FROM {_quote(self.table)}")
+        return int(rows[0]["n"])
+
+    def _track(self, frame: pd.DataFrame):
+        self._max_key = frame.index.max() if len(frame) else None
+        if self._has_updated_column() and self.updated_column in frame.columns and len(frame):
+            self._max_updated = frame[self.updated_column].max()
+
+    def _has_updated_column(self) -> bool:
+        return bool(self.updated_column) and self.updated_column in self._types
+
+    def _full_load(self, columns: List[str]):
+        started = time.perf_counter()
+        self._types = self._column_types()
+        if self.key_column not in self._types:
+            raise ValueError(f"{self.table} has no '{self.key_column}' column to snapshot by")
+        if self._has_updated_column() and self.updated_column not in columns:
+            columns = columns + [self.updated_column]
+        frame = self._fetch(columns)
+        self._track(frame)
+        self._frame = frame
+        self.full_loads += 1
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        print(f"🗂 Dashboard snapshot loaded: {len(frame):,} rows x {len(frame.columns)} columns in {self.last_refresh_ms:.0f} ms")
+
+    def _catch_up(self) -> bool:
+        """Apply rows changed since the last load; False when a full reload is needed."""
+        frame = self._frame
+        columns = list(frame.columns)
+        if self._has_updated_column() and self._max_updated is not None and not pd.isna(self._max_updated):
+            # >= so rows sharing the last seen timestamp are re-read, not missed
+            since = self._max_updated
+            if isinstance(since, pd.Timestamp):
+                since = since.to_pydatetime()
+            elif hasattr(since, "item"):
+                # numpy scalar (integer version column): the driver wants a Python value
+                since = since.item()
+            changed = self._fetch(columns, f"{_quote(self.updated_column)} >= %s", (since,))
+            merged = pd.concat([frame.drop(index=changed.index, errors="ignore"), changed])
+        elif self._max_key is not None:
+            changed = self._fetch(columns, f"{_quote(self.key_column)} > %s", (self._max_key,))
+            if changed.empty:
+                # The marker moved but nothing was appended: an update or delete
+                return False
+            merged = pd.concat([frame, changed])
+        else:
+            return False
+        for column in columns:
+            if self._types.get(column) in TEXT_TYPES:
+                merged[column] = merged[column].astype("category")
+        merged = merged.sort_index()
+        if len(merged) != self._count():
+            return False
+        self._track(merged)
+        self._frame = merged
+        self.incremental_loads += 1
+        return True
+
+    def refresh(self, columns: List[str]):
+        """Make sure ``columns`` are loaded and the snapshot reflects the table's current marker."""
+        frame = self._frame
+        if frame is not None and all(c in frame.columns for c in columns):
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            # Someone else is already refreshing; the current frame is good enough
+            if not self._lock.acquire(blocking=False):
+                return
+        else:
+            self._lock.acquire()
+        try:
+            self._refresh(columns)
+        finally:
+            self._lock.release()
+
+    def _refresh(self, columns: List[str]):
+        """refresh() body; the caller holds ``_lock``."""
+        now = time.monotonic()
+        frame = self._frame
+        missing = [c for c in columns if frame is None or c not in frame.columns]
+        if frame is not None and not missing and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        marker = self.db_manager.schema_cache.fetch_marker()
+        if frame is None or marker != self._marker:
+            started = time.perf_counter()
+            wanted = list(dict.fromkeys((list(frame.columns) if frame is not None else []) + columns))
+            if frame is None or missing or not self._catch_up():
+                self._full_load(wanted)
+            else:
+                self.last_refresh_ms = (time.perf_counter() - started) * 1000
+                print(f"🗂 Dashboard snapshot caught up to {len(self._frame):,} rows in {self.last_refresh_ms:.0f} ms")
+            self._marker = marker
+        elif missing:
+            self._add_columns(missing)
+
+    def _add_columns(self, columns: List[str]):
+        unknown = [c for c in columns if c not in self._types and c != self.key_column]
+        if unknown:
+            self._types = self._column_types()
+        added = self._fetch([c for c in columns if c in self._types and c != self.key_column])
+        self._frame = self._frame.join(added, how="left")
+
+    # Queries
+
+    def _view(self, columns: List[str], date_col=None, start_date=None, end_date=None) -> pd.DataFrame:
+        needed = list(dict.fromkeys([c for c in columns if c] + ([date_col] if date_col else [])))
+        self.refresh([c for c in needed if c != self.key_column])
+        frame = self._frame.reset_index() if self.key_column in needed else self._frame
+        if date_col and start_date and end_date:
+            values = frame[date_col]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors="coerce")
+            frame = frame[(values >= pd.Timestamp(start_date)) & (values <= pd.Timestamp(end_date))]
+        return frame
+
+    def select(self, columns: List[str], date_col=None, start_date=None, end_date=None) -> pd.DataFrame:
+        frame = self._view(columns, date_col, start_date, end_date)[columns].reset_index(drop=True)
+        # Same shape the SQL path returns: plain values, no categoricals
+        for column in columns:
+            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                frame[column] = frame[column].astype(object)
+        return frame
+
+    def aggregate(self, group_by: str, agg_column: str, aggregation: str,
+                  date_col=None, start_date=None, end_date=None) -> pd.DataFrame:
+        frame = self._view([group_by, agg_column], date_col, start_date, end_date)
+        grouped = frame.groupby(group_by, observed=True, dropna=True, sort=True)[agg_column]
+        result = grouped.agg(AGGREGATIONS[aggregation]).reset_index()
+        if isinstance(result[group_by].dtype, pd.CategoricalDtype):
+            result[group_by] = result[group_by].astype(object)
+        return result
+
+    def statistics(self, numeric_columns: List[str], date_col=None, start_date=None, end_date=None) -> List[Dict[str, Any]]:
+        frame = self._view(numeric_columns, date_col, start_date, end_date)
+        stats = []
+        for column in numeric_columns:
+            values = frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            stats.append({
+                "column": column,
+                "mean": float(values.mean()),
+                "median": float(np.median(values)),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else float("nan"),
+            })
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        frame = self._frame
+        return {
+            "table": self.table,
+            "loaded": frame is not None,
+            "rows": len(frame) if frame is not None else 0,
+            "columns": list(frame.columns) if frame is not None else [],
+            "memory_bytes": int(frame.memory_usage(deep=True).sum()) if frame is not None else 0,
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+            "rows_loaded": self.rows_loaded,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+        }
+
+
+_snapshot: Optional[ColumnarSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_dashboard_snapshot() -> ColumnarSnapshot:
+    """Process-wide snapshot over the shared DatabaseManager, configured from settings."""
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                from app.config import settings
+                from app.database import get_shared_db_manager
+
+                _snapshot = ColumnarSnapshot(
+                    get_shared_db_manager(),
+                    key_column=settings.dashboard_snapshot_key_column,
+                    updated_column=settings.dashboard_snapshot_updated_column,
+                    check_interval=settings.dashboard_snapshot_check_interval,
+                    batch_size=settings.dashboard_snapshot_batch_size
+                )
+    return _snapshot
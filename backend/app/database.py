@@ -1,8 +1,99 @@
-import os
-from typing import Any, Dict, List
-import mysql.connector.pooling
+import functools
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import anyio
 from mysql.connector import Error
 
+from app.chat_writer import ChatWriteQueue
+from app.pagination import decode_cursor, encode_cursor
+from app.result_codec import StoredResults, encode_results
+from app.pool import ConnectionPool, PooledConnection
+from app.result_cache import QueryResultCache
+from app.schema_cache import SchemaCache
+from app.sql_validation import CheckedSQL, add_max_execution_time, check_plan, enforce_limit, validate_select
+
+class ResultStream:
+    """Batched reader over an unbuffered cursor with hard row and byte caps.
+
+    Rows are pulled from the server ``batch_size`` at a time. Iteration stops
+    once ``max_rows`` rows or roughly ``max_bytes`` bytes have been read, and
+    ``truncated`` is set. If the result is abandoned before the server has sent
+    every row, the connection is dropped rather than drained.
+    """
+
+    def __init__(self, conn: PooledConnection, cursor, batch_size: int = 500,
+                 max_rows: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._conn = conn
+        self._cursor = cursor
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.columns = [col[0] for col in cursor.description] if cursor.description else []
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated = False
+        self._exhausted = self._drained = not cursor.with_rows
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                return
+            yield batch
+
+    def next_batch(self) -> List[Dict]:
+        if self._exhausted or self._closed:
+            return []
+        size = self.batch_size
+        if self.max_rows is not None:
+            size = min(size, self.max_rows - self.row_count)
+        try:
+            if size <= 0:
+                # Peek one row to tell "exactly max_rows" from "more available"
+                self._exhausted = True
+                self._drained = not self._cursor.fetchmany(1)
+                self.truncated = not self._drained
+                return []
+            rows = self._cursor.fetchmany(size)
+        except Error as err:
+            self.close()
+            raise Exception(f"Query execution failed: {err.msg}")
+        if len(rows) < size:
+            self._exhausted = self._drained = True
+
+        batch = []
+        for row in rows:
+            self.byte_count += sum(len(str(value)) for value in row.values())
+            batch.append(row)
+            if self.max_bytes is not None and self.byte_count > self.max_bytes:
+                self.truncated = True
+                self._exhausted = True
+                break
+        self.row_count += len(batch)
+        return batch
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._drained:
+            try:
+                self._cursor.close()
+            finally:
+                self._conn.close()
+        else:
+            # Unread rows are still on the wire; dropping the connection is
+            # cheaper than reading them all just to discard them.
+            self._conn.invalidate()
+
 class DatabaseManager:
     def __init__(self, config: dict):
         self.config = {
@@ -14,79 +105,242 @@ class DatabaseManager:
         }
         self.pool_name = config.get('pool_name', 'mypool')
         self.pool_size = config.get('pool_size', 5)
+        self.pool_options = {
+            'max_overflow': config.get('max_overflow', 10),
+            'pool_timeout': config.get('pool_timeout', 30),
+            'pool_recycle': config.get('pool_recycle', 3600),
+            'idle_timeout': config.get('idle_timeout', 300),
+            'pre_ping': config.get('pre_ping', True)
+        }
+        self.query_limits = {
+            'batch_size': config.get('query_batch_size', 500),
+            'max_rows': config.get('query_max_rows', 10000),
+            'max_bytes': config.get('query_max_bytes', 50 * 1024 * 1024)
+        }
+        self.sql_guard = {
+            'max_limit': config.get('sql_max_limit', 10000),
+            'max_examined_rows': config.get('sql_max_examined_rows', 10000000),
+            'max_cost': config.get('sql_max_cost'),
+            'max_execution_ms': config.get('sql_max_execution_ms', 30000)
+        }
+        self.history_limits = {
+            'page_size': config.get('history_page_size', 50),
+            'max_page_size': config.get('history_max_page_size', 500)
+        }
+        self.results_codec_options = {
+            'max_rows': config.get('chat_results_max_rows', 1000),
+            'compression': config.get('chat_results_compression', 'zlib')
+        }
+        self.chat_writer_options = {
+            'max_queue': config.get('chat_write_queue_size', 10000),
+            'batch_size': config.get('chat_write_batch_size', 100),
+            'flush_interval': config.get('chat_write_flush_interval', 0.5),
+            'row_retries': config.get('chat_write_row_retries', 2)
+        }
+        self.chat_writer: Optional[ChatWriteQueue] = None
+        self._writer_lock = threading.Lock()
         self._create_pool()
+        self.schema_cache = SchemaCache(
+            self,
+            ttl=config.get('schema_cache_ttl', 600),
+            check_interval=config.get('schema_check_interval', 30)
+        )
+        self.result_cache: Optional[QueryResultCache] = None
+        if config.get('query_cache_enabled', True):
+            self.result_cache = QueryResultCache(
+                self.schema_cache.fetch_marker,
+                table=self.schema_cache.table,
+                max_entries=config.get('query_cache_max_entries', 512),
+                max_bytes=config.get('query_cache_max_bytes', 64 * 1024 * 1024),
+                ttl=config.get('query_cache_ttl', 300),
+                check_interval=config.get('query_cache_check_interval', 10)
+            )
 
     def _create_pool(self):
         """Create connection pool with error handling"""
         try:
-            self.pool = mysql.connector.pooling.MySQLConnectionPool(
-                pool_name=self.pool_name,
+            self.pool = ConnectionPool(
+                self.config,
                 pool_size=self.pool_size,
-                **self.config
+                **self.pool_options
             )
-            # Test the pool
+            # Test the pool; the connection stays idle for the first request
             conn = self.pool.get_connection()
             conn.close()
         except Error as err:
             raise RuntimeError(f"Failed to create connection pool: {err}")
 
-    def get_connection(self):
-        """Get a connection with automatic reconnection"""
+    def get_connection(self) -> PooledConnection:
+        """Get a health-checked connection from the pool"""
         try:
-            conn = self.pool.get_connection()
-            if not conn.is_connected():
-                conn.reconnect(attempts=3, delay=1)
-            return conn
+            return self.pool.get_connection()
         except Error as err:
             raise RuntimeError(f"Failed to get connection: {err}")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {'pool_name': self.pool_name, **self.pool.stats()}
+
+    def close(self):
+        if self.chat_writer is not None:
+            self.chat_writer.stop()
+        self.pool.dispose()
         
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
-        """Execute query with safe parameter handling."""
+    def execute_query(
+        self,
+        query: str,
+        params: tuple = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        limited: bool = True
+    ) -> List[Dict]:
+        """Execute query with safe parameter handling.
+
+        Row-returning statements are read through stream_query, so the row
+        and byte caps bound memory even for an unbounded SELECT. Trusted
+        internal reads pass ``limited=False`` to get every row.
+        """
+        stream = self.stream_query(query, params, max_rows=max_rows, max_bytes=max_bytes, limited=limited)
+        with stream:
+            rows = [row for batch in stream for row in batch]
+        if stream.truncated:
+            print(f"⚠️ Result truncated at {stream.row_count} rows / {stream.byte_count} bytes")
+        return rows
+
+    def lookup_result(
+        self,
+        query: str,
+        params: tuple = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        limited: bool = True
+    ) -> Tuple[Optional[tuple], Optional[List[Dict]]]:
+        """Cached rows for a query, if any, plus the token store_result needs.
+
+        The token is None when the query is not cacheable (it reads anything
+        besides the students table, or the cache is disabled).
+        """
+        cache = self.result_cache
+        if cache is None or not cache.cacheable(query):
+            if cache is not None:
+                cache.bypass()
+            return None, None
+        max_rows, max_bytes = self._limits(max_rows, max_bytes, limited)
+        key = cache.key(query, params, max_rows, max_bytes)
+        generation = cache.generation()
+        rows = cache.get(key, generation)
+        return (key, generation), (list(rows) if rows is not None else None)
+
+    def store_result(self, token: Optional[tuple], rows: List[Dict]):
+        if token is not None and self.result_cache is not None:
+            key, generation = token
+            self.result_cache.set(key, rows, generation)
+
+    def execute_cached(
+        self,
+        query: str,
+        params: tuple = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        limited: bool = True
+    ) -> List[Dict]:
+        """execute_query for read-only students queries, served from the result cache when possible."""
+        token, rows = self.lookup_result(query, params, max_rows, max_bytes, limited)
+        if rows is not None:
+            print(f"⚡ Result cache hit ({len(rows)} rows)")
+            return rows
+        rows = self.execute_query(query, params, max_rows=max_rows, max_bytes=max_bytes, limited=limited)
+        self.store_result(token, rows)
+        return rows
+
+    def result_cache_stats(self) -> Dict[str, Any]:
+        if self.result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.stats()}
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        limited: bool = True
+    ) -> "ResultStream":
+        """Execute query on an unbuffered cursor and return an iterator of row batches."""
         conn = self.get_connection()
         try:
-            with conn.cursor(dictionary=True) as cursor:
-                cursor.execute(query, params or ())
-                if query.strip().lower().startswith('select'):
-                    return cursor.fetchall()
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params or ())
+            if not cursor.with_rows:
                 conn.commit()
-                return []
         except Error as err:
+            conn.invalidate()
             raise Exception(f"Query execution failed: {err.msg}")
-        finally:
-            conn.close()
+        except Exception:
+            conn.invalidate()
+            raise
+        max_rows, max_bytes = self._limits(max_rows, max_bytes, limited)
+        return ResultStream(
+            conn,
+            cursor,
+            batch_size=batch_size or self.query_limits['batch_size'],
+            max_rows=max_rows,
+            max_bytes=max_bytes
+        )
+
+    def _limits(self, max_rows: Optional[int], max_bytes: Optional[int], limited: bool) -> Tuple[Optional[int], Optional[int]]:
+        if not limited:
+            return None, None
+        return (
+            self.query_limits['max_rows'] if max_rows is None else max_rows,
+            self.query_limits['max_bytes'] if max_bytes is None else max_bytes
+        )
+
+    def explain_plan(self, query: str) -> Dict[str, Any]:
+        """EXPLAIN FORMAT=JSON for a query; raises if the server rejects it."""
+        rows = self.execute_query(f"EXPLAIN FORMAT=JSON {query.strip().rstrip(';')}")
+        if not rows:
+            return {}
+        plan = next(iter(rows[0].values()))
+        return json.loads(plan.decode("utf-8") if isinstance(plan, (bytes, bytearray)) else plan)
+
+    def check_query(self, query: str) -> str:
+        """Validate generated SQL and return the statement that may be executed.
+
+        The query must be a single read-only SELECT. Its outer LIMIT is added or
+        capped, the optimizer's row estimate must stay under the configured
+        threshold, and a MAX_EXECUTION_TIME hint bounds its runtime. A query
+        that already came out of check_query (race mode) is returned as is.
+        """
+        if isinstance(query, CheckedSQL):
+            return query
+        checked = enforce_limit(validate_select(query, (self.schema_cache.table,)), self.sql_guard['max_limit'])
+        estimate = check_plan(
+            self.explain_plan(checked),
+            self.sql_guard['max_examined_rows'],
+            self.sql_guard['max_cost']
+        )
+        print(f"📐 Plan estimate: {int(estimate['rows_examined']):,} rows examined, cost {estimate['query_cost']}")
+        return CheckedSQL(add_max_execution_time(checked, self.sql_guard['max_execution_ms']))
 
     def get_excluded_columns(self) -> set:
-        try:
-            with open(os.path.join("app", "excluded_columns.txt"), "r") as f:
-                excluded = {line.strip() for line in f if line.strip() and not line.startswith("#")}
-            return excluded
-        except Exception as e:
-            print(f"Warning: Failed to load excluded_columns.txt - {e}")
-            return set()
+        return self.schema_cache.get_excluded_columns()
+
+    def get_table_columns(self) -> List[str]:
+        """All students column names (exclusions not applied)."""
+        return self.schema_cache.get_column_names()
 
     def get_table_schema(self) -> str:
-        excluded_columns = self.get_excluded_columns()
-        conn = self.get_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE
-                    FROM INFORMATION_SCHEMA.COLUMNS
-                    WHERE TABLE_NAME = 'students' AND TABLE_SCHEMA = %s
-                """, (self.config['database'],))
-                columns = cursor.fetchall()
-
-                schema_str = "Table: students\nColumns:\n"
-                for col in columns:
-                    column_name = col[0]
-                    if column_name not in excluded_columns:
-                        schema_str += f"- {column_name}: {col[1]} ({col[2]})\n"
-                return schema_str
-        finally:
-            conn.close()
+        return self.schema_cache.get_prompt_schema()
     
-    def save_chat(self, **kwargs):
-        """Save chat history with parameter validation."""
+    CHAT_INSERT = """
+        INSERT INTO chats (
+            user_id, conversation_id, message, 
+            response, sql_query, query_results, explanation
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+
+    def _chat_row(self, **kwargs) -> tuple:
         required_fields = {
             'user_id': kwargs.get('user_id'),
             'message': kwargs.get('message'),
@@ -95,50 +349,249 @@ class DatabaseManager:
         
         if None in required_fields.values():
             raise ValueError("Missing required chat fields")
-            
-        query = """
-        INSERT INTO chats (
-            user_id, conversation_id, message, 
-            response, sql_query, query_results, explanation
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        
+
+        return (
+            kwargs.get('user_id'),
+            kwargs.get('conversation_id'),
+            kwargs.get('message'),
+            kwargs.get('response'),
+            kwargs.get('sql_query'),
+            kwargs.get('query_results'),
+            kwargs.get('explanation')
+        )
+
+    def save_chat(self, **kwargs):
+        """Save chat history with parameter validation."""
+        self.save_chats([self._chat_row(**kwargs)])
+
+    def _encode_chat_results(self, row: tuple) -> tuple:
+        query_results = row[5]
+        if isinstance(query_results, list):
+            query_results = encode_results(query_results, **self.results_codec_options)
+        return row[:5] + (query_results,) + row[6:]
+
+    def save_chats(self, rows: List[tuple]):
+        """Insert several chat rows with one multi-row INSERT and one commit."""
+        if not rows:
+            return
+        # Result sets are encoded here, on the writer thread, not in the request
+        rows = [self._encode_chat_results(row) for row in rows]
         conn = self.get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, (
-                    kwargs.get('user_id'),
-                    kwargs.get('conversation_id'),
-                    kwargs.get('message'),
-                    kwargs.get('response'),
-                    kwargs.get('sql_query'),
-                    kwargs.get('query_results'),
-                    kwargs.get('explanation')
-                ))
+                cursor.executemany(self.CHAT_INSERT, rows)
                 conn.commit()
         except Error as err:
             raise Exception(f"Chat save failed: {err.msg}")
         finally:
             conn.close()
 
-    def get_chat_history(self, conversation_id: str) -> List[Dict[str, Any]]:
-        query = """
-        SELECT message, response, sql_query, query_results, created_at
-        FROM chats
-        WHERE conversation_id = %s
-        ORDER BY created_at ASC
+    def queue_chat(self, **kwargs) -> bool:
+        """Validate a chat row and hand it to the write-behind queue."""
+        row = self._chat_row(**kwargs)
+        if self.chat_writer is None:
+            with self._writer_lock:
+                if self.chat_writer is None:
+                    self.chat_writer = ChatWriteQueue(self, **self.chat_writer_options)
+        return self.chat_writer.submit(row)
+
+    def chat_writer_stats(self) -> Dict[str, Any]:
+        return self.chat_writer.stats() if self.chat_writer is not None else {"started": False}
+
+    def _chat_page(
+        self,
+        select_list: str,
+        owner_column: str,
+        owner_value: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        include_results: bool = True
+    ) -> Dict[str, Any]:
+        """Keyset-paginated chats for one owner, oldest first within the page.
+
+        Without a cursor the most recent page is returned. `before` pages
+        towards older rows and `after` towards newer ones; both use the
+        (owner, created_at) index and never scan skipped rows. Without
+        `include_results` the stored rows are neither fetched nor decoded;
+        MySQL reads `result_count` from the stored header.
         """
-        return self.execute_query(query, (conversation_id,))
-    
-    def get_user_chats(self, user_id: str) -> List[Dict[str, Any]]:
-        query = """
-        SELECT message, response AS explanation, sql_query, query_results, created_at
+        if before and after:
+            raise ValueError("Use either 'before' or 'after', not both")
+        limit = max(1, min(limit or self.history_limits['page_size'], self.history_limits['max_page_size']))
+        results = "query_results" if include_results else self.RESULT_COUNT
+        columns = f"id, {select_list}, sql_query, {results}, created_at"
+
+        params: list = [owner_value]
+        if after:
+            created_at, row_id = decode_cursor(after)
+            condition = "AND (created_at > %s OR (created_at = %s AND id > %s))"
+            order = "ASC"
+            params += [created_at, created_at, row_id]
+        elif before:
+            created_at, row_id = decode_cursor(before)
+            condition = "AND (created_at < %s OR (created_at = %s AND id < %s))"
+            order = "DESC"
+            params += [created_at, created_at, row_id]
+        else:
+            condition, order = "", "DESC"
+        params.append(limit + 1)
+
+        query = f"""
+        SELECT {columns}
         FROM chats
-        WHERE user_id = %s
-        ORDER BY created_at ASC
+        WHERE {owner_column} = %s {condition}
+        ORDER BY created_at {order}, id {order}
+        LIMIT %s
         """
-        return self.execute_query(query, (user_id,))
+        rows = self.execute_query(query, tuple(params))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if order == "DESC":
+            rows.reverse()
+        if include_results:
+            for row in rows:
+                stored = StoredResults(row.get("query_results"))
+                row["result_count"] = stored.total
+                row["query_results"] = stored.rows
+
+        return {
+            "items": rows,
+            "page": {
+                "limit": limit,
+                "has_more": has_more,
+                "before": encode_cursor(rows[0]) if rows else None,
+                "after": encode_cursor(rows[-1]) if rows else None
+            }
+        }
+
+    # Header "total" of encoded results, array length for legacy plain lists
+    RESULT_COUNT = """
+        CASE WHEN JSON_VALID(query_results) THEN CAST(COALESCE(
+            JSON_EXTRACT(query_results, '$.total'), JSON_LENGTH(query_results)
+        ) AS UNSIGNED) END AS result_count"""
+
+    def get_chat_history(self, conversation_id: str, **page) -> Dict[str, Any]:
+        return self._chat_page("message, response", "conversation_id", conversation_id, **page)
+    
+    def get_user_chats(self, user_id: str, **page) -> Dict[str, Any]:
+        return self._chat_page("message, response AS explanation", "user_id", user_id, **page)
     
     def get_db_uri(self) -> str:
         """Get SQLAlchemy compatible connection URI"""
-        return f"mysql+pymysql://{self.config['user']}:{self.config['password']}@{self.config['host']}/{self.config['database']}"
\ No newline at end of file
+        return f"mysql+pymysql://{self.config['user']}:{self.config['password']}@{self.config['host']}/{self.config['database']}"
+
+
+
+class AsyncDatabaseManager:
+    """Awaitable facade over DatabaseManager for async routes.
+
+    mysql.connector calls run on worker threads so the event loop keeps
+    serving other requests. Concurrency is capped at the pool's capacity, so
+    excess requests wait on the event loop rather than tying up threads that
+    would only block on pool checkout.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.sync = db_manager
+        self.max_concurrency = db_manager.pool_size + db_manager.pool_options['max_overflow']
+        self._limiter = None
+
+    async def _run(self, func, *args, **kwargs):
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_concurrency)
+        return await anyio.to_thread.run_sync(
+            functools.partial(func, *args, **kwargs),
+            limiter=self._limiter
+        )
+
+    @property
+    def schema_cache(self) -> SchemaCache:
+        return self.sync.schema_cache
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.sync.pool_stats()
+
+    async def execute_query(self, query: str, params: tuple = None, **limits) -> List[Dict]:
+        return await self._run(self.sync.execute_query, query, params, **limits)
+
+    async def execute_cached(self, query: str, params: tuple = None, **limits) -> List[Dict]:
+        return await self._run(self.sync.execute_cached, query, params, **limits)
+
+    async def lookup_result(self, query: str, params: tuple = None, **limits) -> Tuple[Optional[tuple], Optional[List[Dict]]]:
+        return await self._run(self.sync.lookup_result, query, params, **limits)
+
+    def store_result(self, token: Optional[tuple], rows: List[Dict]):
+        self.sync.store_result(token, rows)
+
+    async def stream_query(self, query: str, params: tuple = None, **limits) -> AsyncIterator[List[Dict]]:
+        """Yield row batches as they are read; stopping early releases the cursor."""
+        stream = await self._run(self.sync.stream_query, query, params, **limits)
+        try:
+            while True:
+                batch = await self._run(stream.next_batch)
+                if not batch:
+                    return
+                yield batch
+        finally:
+            await self._run(stream.close)
+
+    async def explain_plan(self, query: str) -> Dict[str, Any]:
+        return await self._run(self.sync.explain_plan, query)
+
+    async def check_query(self, query: str) -> str:
+        return await self._run(self.sync.check_query, query)
+
+    async def get_table_columns(self) -> List[str]:
+        return await self._run(self.sync.get_table_columns)
+
+    async def get_table_schema(self) -> str:
+        return await self._run(self.sync.get_table_schema)
+
+    async def save_chat(self, **kwargs):
+        return await self._run(self.sync.save_chat, **kwargs)
+
+    def queue_chat(self, **kwargs) -> bool:
+        # Non-blocking: the row is written later by the background writer
+        return self.sync.queue_chat(**kwargs)
+
+    async def get_chat_history(self, conversation_id: str, **page) -> Dict[str, Any]:
+        return await self._run(self.sync.get_chat_history, conversation_id, **page)
+
+    async def get_user_chats(self, user_id: str, **page) -> Dict[str, Any]:
+        return await self._run(self.sync.get_user_chats, user_id, **page)
+
+
+# One manager (and therefore one pool) per worker process, created by the
+# FastAPI lifespan handler or lazily on first use.
+_shared_manager: Optional[DatabaseManager] = None
+_shared_async_manager: Optional[AsyncDatabaseManager] = None
+_shared_lock = threading.Lock()
+
+def init_db_manager(config: dict) -> DatabaseManager:
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = DatabaseManager(config)
+        return _shared_manager
+
+def get_shared_db_manager() -> DatabaseManager:
+    if _shared_manager is not None:
+        return _shared_manager
+    from app.config import settings
+    return init_db_manager(settings.db_config)
+
+def get_shared_async_db_manager() -> AsyncDatabaseManager:
+    global _shared_async_manager
+    manager = get_shared_db_manager()
+    if _shared_async_manager is None or _shared_async_manager.sync is not manager:
+        _shared_async_manager = AsyncDatabaseManager(manager)
+    return _shared_async_manager
+
+def close_db_manager():
+    global _shared_manager, _shared_async_manager
+    with _shared_lock:
+        if _shared_manager is not None:
+            _shared_manager.close()
+            _shared_manager = None
+        _shared_async_manager = None
@@ -0,0 +1,121 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(values) -> np.ndarray:
+    """Numeric or datetime values as float64; datetimes become ns since the epoch."""
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype("datetime64[ns]").astype("int64").to_numpy(dtype=np.float64)
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep the line's shape.
+
+    ``x`` must be sorted. The first and last points are always kept; from each
+    bucket in between, the point forming the largest triangle with the previous
+    pick and the next bucket's average is chosen.
+    """
+    x, y = _as_float(x), _as_float(y)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def minmax_decimate(y, threshold: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, so spikes survive; at most ``threshold`` points.
+
+    The first and last points are always kept so the line spans the full x range.
+    """
+    y = _as_float(y)
+    n = len(y)
+    if n <= threshold:
+        return np.arange(n)
+    if threshold < 4:
+        return np.array([0, n - 1][:max(threshold, 1)], dtype=np.int64)
+    buckets = (threshold - 2) // 2
+    bounds = np.linspace(0, n, buckets + 1).astype(np.int64)
+    picked = [0, n - 1]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end > start:
+            chunk = y[start:end]
+            picked += [start + int(np.argmin(chunk)), start + int(np.argmax(chunk))]
+    return np.unique(np.array(picked, dtype=np.int64))
+
+
+def stratified_sample(n: int, budget: int, groups=None, seed: int = 0) -> np.ndarray:
+    """Sorted random row indices, about ``budget`` of them, with each group kept in proportion.
+
+    Every group keeps at least one row, so no colour or category disappears,
+    unless there are more groups than the budget allows.
+    """
+    if n <= budget:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    if groups is None:
+        return np.sort(rng.choice(n, size=budget, replace=False))
+    codes, uniques = pd.factorize(pd.Series(groups), use_na_sentinel=False)
+    if len(uniques) > budget:
+        return np.sort(rng.choice(n, size=budget, replace=False))
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes)
+    quotas = np.maximum(1, np.floor(counts * budget / n)).astype(np.int64)
+    picked, offset = [], 0
+    for count, quota in zip(counts, quotas):
+        members = order[offset:offset + count]
+        picked.append(members if quota >= count else rng.choice(members, size=quota, replace=False))
+        offset += count
+    return np.sort(np.concatenate(picked))
+
+
+def box_statistics(df: pd.DataFrame, y: str, x: Optional[str] = None) -> pd.DataFrame:
+    """Per-group quartiles, Tukey whisker ends and mean, as plotly's box trace computes them."""
+    data = df[[c for c in dict.fromkeys([x, y]) if c]].dropna()
+    data = data.assign(_values=pd.to_numeric(data[y], errors="coerce")).dropna(subset=["_values"])
+    keys = data[x] if x and x != y else pd.Series(0, index=data.index)
+    grouped = data["_values"].groupby(keys, observed=True, sort=True)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = quartiles[0.75] - quartiles[0.25]
+    low = keys.map(quartiles[0.25] - 1.5 * iqr)
+    high = keys.map(quartiles[0.75] + 1.5 * iqr)
+    inside = data["_values"].where((data["_values"] >= low) & (data["_values"] <= high))
+    whiskers = inside.groupby(keys, observed=True, sort=True)
+    return pd.DataFrame({
+        "q1": quartiles[0.25],
+        "median": quartiles[0.5],
+        "q3": quartiles[0.75],
+        "lowerfence": whiskers.min(),
+        "upperfence": whiskers.max(),
+        "mean": grouped.mean(),
+    })
+
+
+def histogram_bins(values, bins: int = 20) -> pd.DataFrame:
+    """Bin centres, widths and counts; categorical values are counted per value."""
+    series = pd.Series(values).dropna()
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+        counts = series.value_counts(sort=False)
+        return pd.DataFrame({"x": counts.index, "count": counts.to_numpy(), "width": None})
+    counts, edges = np.histogram(_as_float(series), bins=bins)
+    centres = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        centres = pd.to_datetime(centres.astype(np.int64))
+        widths = widths / 1e6  # plotly date axes measure bar width in milliseconds
+    return pd.DataFrame({"x": centres, "count": counts, "width": widths})
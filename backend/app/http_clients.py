@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+# httpx clients are bound to the event loop they were first used on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def get_session(base_url: str) -> requests.Session:
+    """Process-wide keep-alive session for an OpenAI-compatible endpoint."""
+    with _lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.http_pool_connections,
+                pool_maxsize=settings.http_pool_maxsize,
+                max_retries=0  # retries and fallback are handled by ProviderGuard
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[base_url] = session
+        return session
+
+
+def get_async_client(base_url: str) -> httpx.AsyncClient:
+    """Keep-alive async client for an endpoint, shared within the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.http_pool_maxsize,
+                    max_keepalive_connections=settings.http_pool_maxsize,
+                    keepalive_expiry=settings.http_keepalive_expiry
+                )
+            )
+            clients[base_url] = client
+        return client
+
+
+async def close_http_clients():
+    """Close pooled clients; call on application shutdown."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        loop = asyncio.get_running_loop()
+        clients = list(_async_clients.pop(loop, {}).values())
+    for session in sessions:
+        session.close()
+    for client in clients:
+        await client.aclose()
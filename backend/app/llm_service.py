@@ -65,35 +65,192 @@
 
 # app/llm_service.py
 
-from typing import List, Dict, Optional
+import asyncio
+from typing import AsyncIterator, List, Dict, Optional
 
 from app.services.cohere_service import CohereService
 from app.services.gemini_service import GeminiService
 from app.services.local_service import LocalLLMService
+from app.services.base import FallbackText, fallback_explanation
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.explanation_cache import explanation_cache_key, get_explanation_cache
+from app.services.sql_cache import get_sql_cache, sql_cache_key
+from app.services.semantic_cache import get_semantic_cache
+from app.services.sql_templates import get_template_matcher
+from app.config import settings
+from app.sql_validation import CheckedSQL
 
 
 
 
                 
 class LLMService:
-    def __init__(self, provider: str = "cohere", cohere_api_key: Optional[str] = None, google_api_key: Optional[str] = None,local_api_url: Optional[str] = "http://localhost:1234/v1",):
+    def __init__(self, provider: str = "cohere", cohere_api_key: Optional[str] = None, google_api_key: Optional[str] = None,local_api_url: Optional[str] = "http://localhost:1234/v1", sql_cache=None, semantic_cache=None, service=None, template_matcher=None, explanation_cache=None):
         self.provider = provider.lower()
-        
-        if self.provider == "cohere":
+        # Any object with get(key)/set(key, value) can be plugged in
+        self.sql_cache = sql_cache if sql_cache is not None else (get_sql_cache() if settings.sql_cache_enabled else None)
+        self.semantic_cache = semantic_cache if semantic_cache is not None else (get_semantic_cache() if settings.semantic_cache_enabled else None)
+        # Common question shapes are answered from templates without an LLM call
+        self.template_matcher = template_matcher if template_matcher is not None else (get_template_matcher() if settings.template_sql_enabled else None)
+        # Same SQL, same rows and same question get the same explanation
+        self.explanation_cache = explanation_cache if explanation_cache is not None else (get_explanation_cache() if settings.explanation_cache_enabled else None)
+
+        if service is not None:
+            # Prebuilt (shared) provider client, see app.services.registry
+            self.service = service
+        elif self.provider == "race":
+            raise ValueError("Race mode is built by the provider registry: use get_provider_registry().get('race')")
+        else:
+            self.service = self._build_service(self.provider, cohere_api_key, google_api_key, local_api_url)
+
+    @staticmethod
+    def _build_service(provider: str, cohere_api_key: Optional[str], google_api_key: Optional[str], local_api_url: Optional[str]):
+        if provider == "cohere":
             if not cohere_api_key:
                 raise ValueError("Cohere API key is required when using Cohere provider")
-            self.service = CohereService(cohere_api_key)
-        elif self.provider == "gemini":
+            return CohereService(cohere_api_key)
+        elif provider == "gemini":
             if not google_api_key:
                 raise ValueError("Google API key is required when using Gemini provider")
-            self.service = GeminiService(google_api_key)
-        elif self.provider == "local":
-            self.service = LocalLLMService(local_api_url)
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+            return GeminiService(google_api_key)
+        elif provider == "local":
+            return LocalLLMService(local_api_url)
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+    def _cached_sql(self, natural_language: str, schema: str) -> Optional[str]:
+        if self.template_matcher is not None:
+            templated = self.template_matcher.match(natural_language, schema)
+            if templated:
+                return templated
+        key = sql_cache_key(natural_language, self.provider, schema) if self.sql_cache is not None else None
+        if key is not None:
+            cached = self.sql_cache.get(key)
+            if cached:
+                print(f"⚡ SQL cache hit ({self.provider})")
+                return cached
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(natural_language, self.provider, schema)
+            if cached:
+                if key is not None:
+                    self.sql_cache.set(key, cached)
+                return cached
+        return None
+
+    def remember_sql(self, natural_language: str, schema: str, sql_query: str):
+        """Cache SQL for the question; call only once it passed check_query and executed."""
+        if not sql_query or not sql_query.strip(" ;"):
+            return
+        if self.template_matcher is not None and self.template_matcher.matches(natural_language, schema):
+            return
+        if self.sql_cache is not None:
+            self.sql_cache.set(sql_cache_key(natural_language, self.provider, schema), str(sql_query))
+        if self.semantic_cache is not None:
+            self.semantic_cache.set(natural_language, self.provider, schema, str(sql_query))
 
     def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        cached = self._cached_sql(natural_language, schema)
+        if cached:
+            return cached
         return self.service.generate_sql_query(natural_language, schema)
 
+    def _explanation_key(self, query: str, results: List[Dict], question: str) -> Optional[str]:
+        if self.explanation_cache is None or not results:
+            return None
+        return explanation_cache_key(query, results, question)
+
+    async def _aexplanation_key(self, query: str, results: List[Dict], question: str) -> Optional[str]:
+        # Hashing a large result set would stall the event loop
+        if self.explanation_cache is not None and len(results) > 500:
+            return await asyncio.to_thread(self._explanation_key, query, results, question)
+        return self._explanation_key(query, results, question)
+
+    def _cached_explanation(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        cached = self.explanation_cache.get(key)
+        if cached:
+            print(f"⚡ Explanation cache hit ({self.provider})")
+        return cached
+
+    def _store_explanation(self, key: Optional[str], explanation: str):
+        if key is not None and explanation and explanation.strip() and not isinstance(explanation, FallbackText):
+            self.explanation_cache.set(key, explanation)
+
     def explain_results(self, query: str, results: List[Dict], question: str) -> str:
-        return self.service.explain_results(query, results, question)
\ No newline at end of file
+        key = self._explanation_key(query, results, question)
+        cached = self._cached_explanation(key)
+        if cached:
+            return cached
+        try:
+            explanation = self.service.explain_results(query, results, question)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            return fallback_explanation(results, e)
+        self._store_explanation(key, explanation)
+        return explanation
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        cached = self._cached_sql(natural_language, schema)
+        if cached:
+            return cached
+        return await self.service.agenerate_sql_query(natural_language, schema)
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        key = await self._aexplanation_key(query, results, question)
+        cached = self._cached_explanation(key)
+        if cached:
+            return cached
+        try:
+            explanation = await self.service.aexplain_results(query, results, question)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            # The providers have already recorded the failure; the rows are still worth returning
+            return fallback_explanation(results, e)
+        self._store_explanation(key, explanation)
+        return explanation
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await self.service.agenerate_text(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    def clean_sql(self, raw_text: str) -> str:
+        if isinstance(raw_text, CheckedSQL):
+            return raw_text
+        return self.service._clean_sql(raw_text)
+
+    async def stream_sql(self, natural_language: str, schema: str) -> AsyncIterator[str]:
+        """Yield SQL as it is generated; clean_sql() of the joined chunks is the final query."""
+        cached = self._cached_sql(natural_language, schema)
+        if cached:
+            yield cached
+            return
+        async for chunk in self.service.stream_sql(natural_language, schema):
+            yield chunk
+
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> AsyncIterator[str]:
+        async for chunk in self.service.astream_text(prompt, max_tokens=max_tokens, temperature=temperature):
+            yield chunk
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str) -> AsyncIterator[str]:
+        key = await self._aexplanation_key(query, results, question)
+        cached = self._cached_explanation(key)
+        if cached:
+            yield cached
+            return
+        parts, fallback = [], False
+        try:
+            async for chunk in self.service.stream_explanation(query, results, question):
+                parts.append(chunk)
+                fallback = fallback or isinstance(chunk, FallbackText)
+                yield chunk
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            # An interrupted answer is reported as an error, never stored as complete
+            if parts:
+                raise
+            yield fallback_explanation(results, e)
+            return
+        if not fallback:
+            self._store_explanation(key, "".join(parts).strip())
@@ -7,18 +7,36 @@ import cohere
 import mysql.connector
 from typing import Optional
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import sqlparse
 
-from app.database import DatabaseManager
+from app.config import settings
+from app.database import DatabaseManager, init_db_manager, close_db_manager
 from app.llm_service import LLMService
+from app.services.registry import init_provider_registry
+from app.http_clients import close_http_clients
+from app.routers import metrics
 from app.routers.chat import fraud_analysis,chat_history
 
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared connection pool per worker instead of one per request
+    try:
+        init_db_manager(settings.db_config)
+    except Exception as e:
+        print(f"⚠️ Database pool initialization failed, will retry on first request: {str(e)}")
+    # LLM clients and prompt templates are built once, not per request
+    init_provider_registry()
+    yield
+    await close_http_clients()
+    close_db_manager()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 app.add_middleware(
@@ -35,6 +53,7 @@ main_router = APIRouter(prefix=API_PREFIX)
 
 main_router.include_router(fraud_analysis.router)
 main_router.include_router(chat_history.router)
+main_router.include_router(metrics.router)
 
 app.include_router(main_router)
 
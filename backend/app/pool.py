@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+def _mysql_connect(**config):
+    import mysql.connector
+
+    return mysql.connector.connect(**config)
+
+
+class PooledConnection:
+    """Proxy around a raw MySQL connection that returns itself to the pool on close()."""
+
+    def __init__(self, pool: "ConnectionPool", conn, created_at: float):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        if self._released:
+            return
+        self._released = True
+        self._pool._discard(self._conn)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._conn, self._created_at)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with overflow, recycling and pre-ping.
+
+    ``pool_size`` connections are kept idle between requests, up to
+    ``max_overflow`` extra connections are opened under load and closed again
+    when they are returned. Connections older than ``pool_recycle`` seconds or
+    idle for longer than ``idle_timeout`` seconds are replaced on checkout.
+    ``connector`` opens a raw connection from the config (mysql.connector.connect
+    by default).
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: float = 3600,
+        idle_timeout: float = 300,
+        pre_ping: bool = True,
+        connector: Optional[Callable[..., Any]] = None,
+    ):
+        self.config = config
+        self.connector = connector or _mysql_connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+
+        self._idle = deque()  # (conn, created_at, returned_at)
+        self._cond = threading.Condition()
+        self._open = 0
+        self._checked_out = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        return self.connector(**self.config)
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, created_at: float, returned_at: float, now: float) -> bool:
+        if self.pool_recycle and now - created_at > self.pool_recycle:
+            return True
+        if self.idle_timeout and now - returned_at > self.idle_timeout:
+            return True
+        return False
+
+    def _ping(self, conn) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        timeout = self.pool_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if not self._idle and self._open >= self.pool_size + self.max_overflow:
+                # Only callers that actually block count as waiting
+                self._waiting += 1
+                try:
+                    while not self._idle and self._open >= self.pool_size + self.max_overflow:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"Timed out after {timeout}s waiting for a database connection"
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._open += 1
+            self._checked_out += 1
+            self._checkouts += 1
+            waited = time.monotonic() - started
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        # Network I/O happens outside the lock.
+        try:
+            if entry is not None:
+                conn, created_at, returned_at = entry
+                now = time.monotonic()
+                if self._is_stale(created_at, returned_at, now):
+                    with self._cond:
+                        self._recycled += 1
+                    self._close_quietly(conn)
+                    entry = None
+                elif self.pre_ping and not self._ping(conn):
+                    with self._cond:
+                        self._ping_failures += 1
+                    self._close_quietly(conn)
+                    entry = None
+            if entry is None:
+                conn, created_at = self._connect(), time.monotonic()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, conn, created_at)
+
+    def _release(self, conn, created_at: float):
+        with self._cond:
+            self._checked_out -= 1
+            keep = not self._closed and len(self._idle) < self.pool_size
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(conn)
+
+    def _discard(self, conn):
+        with self._cond:
+            self._checked_out -= 1
+            self._open -= 1
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    def dispose(self):
+        """Close every idle connection and refuse new checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "overflow": max(0, self._open - self.pool_size),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
@@ -0,0 +1,123 @@
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import sqlparse
+
+from app.cache import LRUCache
+from app.sql_validation import table_references
+
+_MISSING = object()
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+`?(\w+)`?(?:\s*\.\s*`?(\w+)`?)?", re.IGNORECASE)
+
+
+def canonical_sql(sql: str) -> str:
+    """Keyword case, whitespace, comments and the trailing ';' normalized away."""
+    formatted = sqlparse.format(sql, keyword_case="upper", strip_comments=True, strip_whitespace=True)
+    return formatted.strip().rstrip(";").strip()
+
+
+def result_size(rows: List[Dict]) -> int:
+    # Same rough measure as ResultStream's byte cap
+    return sum(len(str(key)) + len(str(value)) for row in rows for key, value in row.items()) + 64 * len(rows)
+
+
+class QueryResultCache:
+    """Result rows of read-only queries against one table, shared by all callers.
+
+    Entries are keyed on the canonicalized SQL, its parameters and the row/byte
+    caps it was run with. The whole cache is dropped when the table's
+    CREATE_TIME/UPDATE_TIME marker changes, checked at most every
+    ``check_interval`` seconds; ``ttl`` bounds staleness when the server
+    reports the marker lazily (InnoDB, information_schema_stats_expiry).
+    Memory is bounded by the summed size of the cached results.
+    """
+
+    def __init__(
+        self,
+        fetch_marker: Callable[[], Any],
+        table: str = "students",
+        max_entries: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 300,
+        check_interval: float = 10,
+    ):
+        self.fetch_marker = fetch_marker
+        self.table = table.lower()
+        self.check_interval = check_interval
+        self.entries = LRUCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes, sizeof=result_size)
+
+        self._lock = threading.Lock()
+        self._marker = _MISSING
+        self._checked_at = 0.0
+        self._generation = 0
+        self._invalidations = 0
+        self._bypassed = 0
+
+    def cacheable(self, sql: str) -> bool:
+        """Only statements that read nothing but the tracked table are cached."""
+        tables = {(table or name).lower() for name, table in _TABLE_REF.findall(sql or "")}
+        # The regex only sees the first item of "FROM a, b"
+        tables.update(table.lower() for _, table in table_references(sql))
+        return tables == {self.table}
+
+    def key(self, sql: str, params: Optional[tuple], *limits) -> str:
+        raw = "\x1f".join([canonical_sql(sql), repr(tuple(params or ())), repr(limits)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def generation(self) -> int:
+        """Current data generation; re-reads the table marker once per check_interval."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return self._generation
+            self._checked_at = now
+        try:
+            marker = self.fetch_marker()
+        except Exception as e:
+            print(f"⚠️ Result cache marker check failed: {str(e)}")
+            marker = _MISSING
+        with self._lock:
+            if marker is _MISSING or marker != self._marker:
+                if self._marker is not _MISSING:
+                    self._invalidations += 1
+                    print(f"🧹 {self.table} changed; result cache cleared")
+                self._marker = marker
+                self._generation += 1
+                self.entries.clear()
+            return self._generation
+
+    def get(self, key: str, generation: int) -> Optional[List[Dict]]:
+        rows = self.entries.get(key, _MISSING)
+        if rows is _MISSING:
+            return None
+        return rows if generation == self._generation else None
+
+    def set(self, key: str, rows: List[Dict], generation: int):
+        # Rows read while the table changed underneath are not kept
+        if generation == self._generation:
+            self.entries.set(key, rows)
+
+    def bypass(self):
+        with self._lock:
+            self._bypassed += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._marker = _MISSING
+            self._checked_at = 0.0
+            self._generation += 1
+            self._invalidations += 1
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "table": self.table,
+                "generation": self._generation,
+                "invalidations": self._invalidations,
+                "bypassed": self._bypassed,
+                **self.entries.stats(),
+            }
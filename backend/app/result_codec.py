@@ -0,0 +1,124 @@
+import base64
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+FORMAT_VERSION = 1
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to decode zstd-compressed query results")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_results(
+    results: Optional[List[Dict[str, Any]]],
+    max_rows: Optional[int] = 1000,
+    compression: Optional[str] = "zlib",
+    compress_min_bytes: int = 1024,
+) -> Optional[str]:
+    """Serialize query results for the chats.query_results column.
+
+    Rows are stored column-wise (column names once, then one value array per
+    row) and capped at ``max_rows`` with the original row count kept in
+    ``total``. Payloads larger than ``compress_min_bytes`` are compressed with
+    zstd or zlib and base64-wrapped, so the stored value is always valid JSON.
+    """
+    if not results:
+        return None
+
+    columns = list(results[0].keys())
+    kept = results[:max_rows] if max_rows else results
+    body = {
+        "columns": columns,
+        "rows": [[row.get(col) for col in columns] for row in kept],
+    }
+    header = {"v": FORMAT_VERSION, "total": len(results), "truncated": len(kept) < len(results)}
+
+    encoded = _dumps(body)
+    if compression and len(encoded) >= compress_min_bytes:
+        codec = "zstd" if compression == "zstd" and zstandard is not None else "zlib"
+        data = base64.b64encode(_compress(encoded.encode("utf-8"), codec)).decode("ascii")
+        return _dumps({**header, "codec": codec, "data": data})
+    return _dumps({**header, **body})
+
+
+def _parse(stored: Any) -> Any:
+    if isinstance(stored, (bytes, bytearray)):
+        stored = stored.decode("utf-8", errors="replace")
+    if not isinstance(stored, str):
+        return stored
+    try:
+        return json.loads(stored)
+    except ValueError as e:
+        print(f"⚠️ Stored query results are not valid JSON, returning them raw: {str(e)}")
+        return stored
+
+
+class StoredResults:
+    """One chats.query_results value, parsed once; rows are decoded on first access."""
+
+    def __init__(self, stored: Any):
+        self.raw = stored
+        self._parsed = _parse(stored) if stored is not None else None
+        self._rows = None
+        self._decoded = False
+
+    @property
+    def encoded(self) -> bool:
+        return isinstance(self._parsed, dict) and "v" in self._parsed
+
+    @property
+    def total(self) -> Optional[int]:
+        """Total row count without decompressing the rows."""
+        if self.encoded:
+            return self._parsed.get("total")
+        return len(self._parsed) if isinstance(self._parsed, list) else None
+
+    @property
+    def rows(self) -> Any:
+        if not self._decoded:
+            self._rows = self._decode()
+            self._decoded = True
+        return self._rows
+
+    def _decode(self) -> Any:
+        if not self.encoded:
+            return self._parsed
+        body = self._parsed
+        try:
+            if "codec" in body:
+                body = json.loads(_decompress(base64.b64decode(body["data"]), body["codec"]))
+            columns = body["columns"]
+            return [dict(zip(columns, values)) for values in body["rows"]]
+        except Exception as e:
+            print(f"⚠️ Failed to decode stored query results, returning them raw: {str(e)}")
+            return self.raw
+
+
+def result_count(stored: Any) -> Optional[int]:
+    """Total row count without decompressing the rows."""
+    return StoredResults(stored).total
+
+
+def decode_results(stored: Any) -> Optional[List[Dict[str, Any]]]:
+    """Inverse of encode_results; legacy rows holding a plain JSON list are returned as-is."""
+    return StoredResults(stored).rows
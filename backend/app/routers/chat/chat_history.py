@@ -1,8 +1,13 @@
 import json
-from fastapi import APIRouter, HTTPException, Depends
-from langchain_openai import ChatOpenAI
-from app.database import DatabaseManager
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.database import AsyncDatabaseManager, get_shared_async_db_manager
 from app.llm_service import LLMService
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.registry import get_provider_registry
+from app.sql_validation import QueryTooExpensiveError, SQLValidationError, validate_select
 from app.models.chat import ChatRequest
 from app.config import settings
 import mysql.connector
@@ -15,14 +20,19 @@ from fastapi import HTTPException, status
 
 router = APIRouter(prefix="/chat")
 
+NO_RESULTS_EXPLANATION = (
+    "🔍 I ran the query, but found no matching results.\n"
+    "This may be because:\n"
+    "- The information doesn't exist.\n"
+    "- The query was too narrow.\n"
+    "- Or the student or field was mistyped.\n\n"
+    "Try refining your request or ask for broader insights."
+)
+
 def get_db_manager():
     try:
-        manager = DatabaseManager(settings.db_config)
-        # Verify connection works
-        with manager.get_connection() as conn:
-            if not conn.is_connected():
-                conn.reconnect(attempts=3, delay=1)
-        return manager
+        # Process-wide manager; connections are health-checked by the pool on checkout
+        return get_shared_async_db_manager()
     except Error as err:
         raise HTTPException(
             status_code=500,
@@ -34,47 +44,50 @@ def get_db_manager():
             detail=f"Database initialization error: {str(e)}"
         )
 
+def _too_expensive_detail(error: QueryTooExpensiveError, sql_query: Optional[str]) -> dict:
+    return {
+        "error": "Query too expensive",
+        "message": str(error),
+        "generated_query": sql_query,
+        "resolution": "Narrow the question, e.g. add a filter or ask for fewer rows."
+    }
+
 def get_llm_service(provider: str):
-    return LLMService(
-        provider=provider.lower(),
-        cohere_api_key=settings.cohere_api_key,
-        google_api_key=settings.google_api_key,
-        local_api_url="http://localhost:1234/v1"
-    )
+    # Clients are built once at startup and shared across requests
+    try:
+        return get_provider_registry().get(provider)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/chat-with-db")
 async def chat_with_db(
     request: ChatRequest,
-    db_manager: DatabaseManager = Depends(get_db_manager),
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager),
     llm_service: LLMService = Depends(get_llm_service)
 ):
+    generated_sql = None
     try:
-        schema = db_manager.get_table_schema()
+        schema = await db_manager.get_table_schema()
         print(f"📦 Schema used: {schema}")
    
-        generated_sql = llm_service.generate_sql_query(request.message, schema)
+        generated_sql = await llm_service.agenerate_sql_query(request.message, schema)
         print(f"🛠 SQL Generated: {generated_sql}")
 
-        results = db_manager.execute_query(generated_sql)
+        generated_sql = await db_manager.check_query(generated_sql)
+        results = await db_manager.execute_cached(generated_sql)
         print(f"📊 Query Results: {results}")
+        llm_service.remember_sql(request.message, schema, generated_sql)
 
         if not results:
-            explanation = (
-                "🔍 I ran the query, but found no matching results.\n"
-                "This may be because:\n"
-                "- The information doesn't exist.\n"
-                "- The query was too narrow.\n"
-                "- Or the student or field was mistyped.\n\n"
-                "Try refining your request or ask for broader insights."
-            )
+            explanation = NO_RESULTS_EXPLANATION
         else:
-            explanation = llm_service.explain_results(generated_sql, results, request.message)
+            explanation = await llm_service.aexplain_results(generated_sql, results, request.message)
 
-        db_manager.save_chat(
+        db_manager.queue_chat(
             message=request.message,
             response=explanation,
             sql_query=generated_sql,
-            query_results=json.dumps(results) if results else None,
+            query_results=results or None,
             explanation=explanation,
             user_id="1",
             conversation_id=request.conversation_id or "default",
@@ -88,6 +101,25 @@ async def chat_with_db(
             "provider": request.provider
         }
 
+    except CircuitOpenError as ce:
+        raise HTTPException(
+            status_code=503,
+            detail=str(ce)
+        )
+    except QueryTooExpensiveError as qe:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=_too_expensive_detail(qe, generated_sql)
+        )
+    except SQLValidationError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "error": "Invalid query",
+                "message": str(ve),
+                "generated_query": generated_sql
+            }
+        )
     except ValueError as ve:
         raise HTTPException(
             status_code=400,
@@ -99,21 +131,126 @@ async def chat_with_db(
             detail=f"Processing failed: {str(e)}"
         )
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@router.post("/chat-with-db/stream")
+async def chat_with_db_stream(
+    request: ChatRequest,
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager),
+    llm_service: LLMService = Depends(get_llm_service)
+):
+    """Server-sent events variant of /chat-with-db.
+
+    Emits `sql_token` events while the query is being written, `sql` once it
+    is complete, `rows` in chunks, then `explanation` tokens and a final
+    `done` event. Failures are reported as an
+    `error` event since the response status has already been sent.
+    """
+    async def event_stream():
+        generated_sql = None
+        try:
+            schema = await db_manager.get_table_schema()
+            sql_parts = []
+            async for token in llm_service.stream_sql(request.message, schema):
+                sql_parts.append(token)
+                yield _sse("sql_token", {"token": token})
+            # A race winner arrives as one already-checked chunk
+            raw_sql = sql_parts[0] if len(sql_parts) == 1 else "".join(sql_parts)
+            generated_sql = llm_service.clean_sql(raw_sql)
+            generated_sql = await db_manager.check_query(generated_sql)
+            yield _sse("sql", {"sql_query": generated_sql, "provider": request.provider})
+
+            token, results = await db_manager.lookup_result(generated_sql)
+            if results is not None:
+                for offset in range(0, len(results), settings.stream_row_chunk_size):
+                    yield _sse("rows", {
+                        "offset": offset,
+                        "rows": results[offset:offset + settings.stream_row_chunk_size]
+                    })
+            else:
+                # Rows are forwarded batch by batch while the cursor is being read
+                results = []
+                async for batch in db_manager.stream_query(
+                    generated_sql, batch_size=settings.stream_row_chunk_size
+                ):
+                    yield _sse("rows", {"offset": len(results), "rows": batch})
+                    results.extend(batch)
+                db_manager.store_result(token, results)
+            llm_service.remember_sql(request.message, schema, generated_sql)
+
+            if not results:
+                explanation = NO_RESULTS_EXPLANATION
+                yield _sse("explanation", {"token": explanation})
+            else:
+                parts = []
+                async for token in llm_service.stream_explanation(generated_sql, results, request.message):
+                    parts.append(token)
+                    yield _sse("explanation", {"token": token})
+                explanation = "".join(parts).strip()
+
+            yield _sse("done", {"result_count": len(results), "provider": request.provider})
+        except QueryTooExpensiveError as qe:
+            yield _sse("error", _too_expensive_detail(qe, generated_sql))
+            return
+        except SQLValidationError as ve:
+            yield _sse("error", {"error": "Invalid query", "message": str(ve), "generated_query": generated_sql})
+            return
+        except Exception as e:
+            yield _sse("error", {"error": "Processing failed", "message": str(e)})
+            return
+
+        try:
+            db_manager.queue_chat(
+                message=request.message,
+                response=explanation,
+                sql_query=generated_sql,
+                query_results=results or None,
+                explanation=explanation,
+                user_id="1",
+                conversation_id=request.conversation_id or "default",
+                provider=request.provider
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to save chat: {str(e)}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/chat-history/{conversation_id}")
 async def get_chat_history(
     conversation_id: str,
-    db_manager: DatabaseManager = Depends(get_db_manager)
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    include_results: bool = True,
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager)
 ):
+    """Keyset-paginated conversation history; include_results=false for a light listing"""
     try:
-        history = db_manager.get_chat_history(conversation_id)
-        if not history:
+        page = await db_manager.get_chat_history(
+            conversation_id,
+            before=before,
+            after=after,
+            limit=limit,
+            include_results=include_results
+        )
+        if not page["items"] and not (before or after):
             raise HTTPException(
                 status_code=404,
                 detail="No chat history found"
             )
-        return {"conversation_id": conversation_id, "history": history}
+        return {"conversation_id": conversation_id, "history": page["items"], "page": page["page"]}
     except HTTPException:
         raise
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(ve)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -123,18 +260,34 @@ async def get_chat_history(
 @router.get("/user-chats/{user_id}")
 async def get_user_chats(
     user_id: str,
-    db_manager: DatabaseManager = Depends(get_db_manager)
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    include_results: bool = True,
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager)
 ):
+    """Keyset-paginated chats for a user; include_results=false for a light listing"""
     try:
-        chats = db_manager.get_user_chats(user_id)
-        if not chats:
+        page = await db_manager.get_user_chats(
+            user_id,
+            before=before,
+            after=after,
+            limit=limit,
+            include_results=include_results
+        )
+        if not page["items"] and not (before or after):
             raise HTTPException(
                 status_code=404,
                 detail="No chats found for this user"
             )
-        return {"user_id": user_id, "chats": chats}
+        return {"user_id": user_id, "chats": page["items"], "page": page["page"]}
     except HTTPException:
         raise
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(ve)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -145,52 +298,35 @@ async def get_user_chats(
 @router.post("/query-with-chain")
 async def query_with_chain(
     request: ChatRequest,
-    db_manager: DatabaseManager = Depends(get_db_manager)
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager)
 ):
     """Advanced query using LangChain SQL generation with robust execution"""
     try:
-        # Initialize LLM with error handling
-        try:
-            llm = ChatOpenAI(
-                model="anthropic/claude-3-haiku",
-                openai_api_base="https://openrouter.ai/api/v1",
-                openai_api_key=settings.openai_api_key,
-                temperature=0.1,
-                max_tokens=200,
-            )
-            # Test LLM connection
-            llm.invoke("test")
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail={
-                    "error": "AI service authentication failed",
-                    "message": "Please check your API credentials",
-                    "resolution": "Ensure your OpenRouter API key is valid and has sufficient credits"
-                }
-            )
+        # Shared client; health comes from real calls instead of a probe call
+        registry = get_provider_registry()
+        llm = registry.chat_model()
+        guard = registry.guard("openrouter")
+        unavailable = HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "AI service unavailable",
+                "message": "Recent requests to the AI service failed",
+                "resolution": "Please try again in a few seconds"
+            }
+        )
 
-        # Dynamically fetch all column names with error handling
+        # Column names come from the shared schema cache
         try:
-            with db_manager.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT COLUMN_NAME 
-                        FROM INFORMATION_SCHEMA.COLUMNS 
-                        WHERE TABLE_NAME = 'students' 
-                        AND TABLE_SCHEMA = %s
-                    """, (settings.db_name,))
-                    columns = [row[0] for row in cursor.fetchall()]
-                    
-                    if not columns:
-                        raise HTTPException(
-                            status_code=status.HTTP_404_NOT_FOUND,
-                            detail={
-                                "error": "No columns found",
-                                "message": "The students table appears to be empty or doesn't exist",
-                                "resolution": "Verify your database schema and table names"
-                            }
-                        )
+            columns = await db_manager.get_table_columns()
+            if not columns:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail={
+                        "error": "No columns found",
+                        "message": "The students table appears to be empty or doesn't exist",
+                        "resolution": "Verify your database schema and table names"
+                    }
+                )
         except HTTPException:
             raise
         except Exception as e:
@@ -234,10 +370,23 @@ async def query_with_chain(
         
         for attempt in range(max_retries):
             try:
-                sql_response = llm.invoke(PROMPT.format(
-                    input=request.message,
-                    columns=", ".join(columns)
-                )).content
+                prompt = PROMPT.format(input=request.message, columns=", ".join(columns))
+                try:
+                    # Adaptive timeout, hedging and circuit breaking per provider
+                    sql_response = (await guard.call("sql", lambda: llm.ainvoke(prompt))).content
+                except CircuitOpenError:
+                    raise unavailable
+                except Exception as e:
+                    if getattr(e, "status_code", None) in (401, 402, 403):
+                        raise HTTPException(
+                            status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail={
+                                "error": "AI service authentication failed",
+                                "message": "Please check your API credentials",
+                                "resolution": "Ensure your OpenRouter API key is valid and has sufficient credits"
+                            }
+                        )
+                    raise
                 
                 # Clean and validate SQL
                 generated_sql = sql_response.strip()
@@ -245,26 +394,18 @@ async def query_with_chain(
                     generated_sql = generated_sql.split("```sql")[1].split("```")[0].strip()
                 generated_sql = generated_sql.rstrip(';').strip() + ';'
                 
-                # Basic SQL validation
-                if not generated_sql.lower().startswith(('select', 'with')):
+                # Single read-only SELECT only
+                try:
+                    validate_select(generated_sql)
+                except SQLValidationError as ve:
                     raise HTTPException(
                         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                         detail={
-                            "error": "Invalid query type",
-                            "message": "Generated query must be a SELECT statement",
+                            "error": "Invalid query",
+                            "message": str(ve),
                             "generated_query": generated_sql
                         }
-                    )
-                if ';' in generated_sql[:-1]:
-                    raise HTTPException(
-                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                        detail={
-                            "error": "Multiple statements detected",
-                            "message": "Query contains multiple SQL statements",
-                            "generated_query": generated_sql
-                        }
-                    )
-                
+                    )                
                 break
             except HTTPException:
                 raise
@@ -282,10 +423,13 @@ async def query_with_chain(
 
         # Execute query with enhanced safety
         try:
-            with db_manager.get_connection() as conn:
-                with conn.cursor(dictionary=True) as cursor:
-                    cursor.execute(generated_sql)
-                    results = cursor.fetchall()
+            generated_sql = await db_manager.check_query(generated_sql)
+            results = await db_manager.execute_cached(generated_sql)
+        except QueryTooExpensiveError as qe:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=_too_expensive_detail(qe, generated_sql)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -309,17 +453,17 @@ async def query_with_chain(
             Focus on key insights and patterns.
             """
             
-            explanation = llm.invoke(explanation_prompt).content
+            explanation = (await guard.call("explain", lambda: llm.ainvoke(explanation_prompt))).content
         except Exception as e:
             explanation = "Results analysis unavailable - please review the raw data"
 
-        # Save with transaction handling
+        # Hand off to the write-behind queue
         try:
-            db_manager.save_chat(
+            db_manager.queue_chat(
                 message=request.message,
                 response=explanation,
                 sql_query=generated_sql,
-                query_results=json.dumps(results),
+                query_results=results or None,
                 user_id="1",
                 conversation_id=request.conversation_id or "chain-query",
                 provider=request.provider
@@ -76,10 +76,12 @@
 
 import json
 from fastapi import APIRouter, Depends, HTTPException
-from app.database import DatabaseManager
+from app.database import AsyncDatabaseManager, get_shared_async_db_manager
 from app.llm_service import LLMService
 from app.models.chat import ChatRequest
 from app.config import settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.registry import get_provider_registry
 import mysql.connector
 from mysql.connector import Error
 
@@ -87,12 +89,8 @@ router = APIRouter(prefix="/fraud-analysis")
 
 def get_db_manager():
     try:
-        manager = DatabaseManager(settings.db_config)
-        # Verify connection works
-        with manager.get_connection() as conn:
-            if not conn.is_connected():
-                conn.reconnect(attempts=3, delay=1)
-        return manager
+        # Process-wide manager; connections are health-checked by the pool on checkout
+        return get_shared_async_db_manager()
     except Error as err:
         raise HTTPException(
             status_code=500,
@@ -105,19 +103,17 @@ def get_db_manager():
         )
 
 def get_llm_service(provider: str):
-    """Dependency that provides configured LLM service"""
-    return LLMService(
-        provider=provider.lower(),
-        cohere_api_key=settings.cohere_api_key,
-        google_api_key=settings.google_api_key,
-        local_api_url="http://localhost:1234/v1" if provider.lower() == "local" else None
-    )
+    """Dependency that provides the shared, startup-built LLM service"""
+    try:
+        return get_provider_registry().get(provider)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/analyze-student/{student_id}")
 async def analyze_student_fraud(
     student_id: int,
     request: ChatRequest,
-    db_manager: DatabaseManager = Depends(get_db_manager),
+    db_manager: AsyncDatabaseManager = Depends(get_db_manager),
     llm_service: LLMService = Depends(get_llm_service)
 ):
     """Specialized endpoint for fraud analysis of a specific student"""
@@ -132,7 +128,7 @@ async def analyze_student_fraud(
         WHERE id = %s
         """
         
-        student_data = db_manager.execute_query(query, (student_id,))
+        student_data = await db_manager.execute_query(query, (student_id,))
         
         if not student_data:
             raise HTTPException(
@@ -152,27 +148,19 @@ async def analyze_student_fraud(
         4. Any signs of potential fraud ring participation
         """
         
-        # Generate analysis based on provider
-        if request.provider.lower() == "cohere":
-            analysis = llm_service.service.co.generate(
-                model="command",
-                prompt=prompt,
-                max_tokens=500,
-                temperature=0.1
-            ).generations[0].text
-        else:
-            analysis = llm_service.service._generate_text(
-                prompt, 
-                max_tokens=500, 
-                temperature=0.1
-            )
+        # Generate analysis with the provider's async client
+        analysis = await llm_service.agenerate_text(
+            prompt,
+            max_tokens=500,
+            temperature=0.1
+        )
         
         # Save analysis to database
-        db_manager.save_chat(
+        db_manager.queue_chat(
             message=f"Fraud analysis request for student {student_id}",
             response=analysis,
             sql_query=query,
-            query_results=json.dumps(student_data),
+            query_results=student_data,
             explanation="Fraud risk assessment",
             user_id="1",  # Should be replaced with actual user ID from auth
             conversation_id=request.conversation_id or "fraud-analysis",
@@ -187,6 +175,11 @@ async def analyze_student_fraud(
         
     except HTTPException:
         raise
+    except CircuitOpenError as ce:
+        raise HTTPException(
+            status_code=503,
+            detail=str(ce)
+        )
     except ValueError as ve:
         raise HTTPException(
             status_code=400,
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException
+
+from app.database import get_shared_db_manager
+from app.services.explanation_cache import get_explanation_cache
+from app.services.sql_cache import get_sql_cache
+from app.services.semantic_cache import get_semantic_cache
+from app.services.sql_templates import get_template_matcher
+from app.services.race_service import race_stats
+from app.services.registry import get_provider_registry
+
+router = APIRouter(prefix="/metrics")
+
+@router.get("/pool")
+async def get_pool_metrics():
+    """Connection pool usage for this worker process"""
+    try:
+        return get_shared_db_manager().pool_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Database pool unavailable: {str(e)}"
+        )
+
+@router.get("/schema-cache")
+async def get_schema_cache_metrics():
+    """Schema cache hit/miss counters for this worker process"""
+    try:
+        return get_shared_db_manager().schema_cache.stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Schema cache unavailable: {str(e)}"
+        )
+
+@router.get("/result-cache")
+async def get_result_cache_metrics():
+    """Query result cache hit/miss, eviction and invalidation counters for this worker process"""
+    try:
+        return get_shared_db_manager().result_cache_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Result cache unavailable: {str(e)}"
+        )
+
+@router.get("/chat-writer")
+async def get_chat_writer_metrics():
+    """Write-behind chat history queue counters for this worker process"""
+    try:
+        return get_shared_db_manager().chat_writer_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Chat writer unavailable: {str(e)}"
+        )
+
+@router.get("/sql-cache")
+async def get_sql_cache_metrics():
+    """NL-to-SQL template, exact and semantic cache counters for this worker process"""
+    return {
+        "templates": get_template_matcher().stats(),
+        "exact": get_sql_cache().stats(),
+        "semantic": get_semantic_cache().stats()
+    }
+
+@router.get("/explanation-cache")
+async def get_explanation_cache_metrics():
+    """Result explanation cache counters for this worker process"""
+    return get_explanation_cache().stats()
+
+@router.get("/race")
+async def get_race_metrics():
+    """Race-mode wins, invalid candidates and errors per provider for this worker process"""
+    return race_stats()
+
+@router.get("/llm-providers")
+async def get_llm_provider_metrics():
+    """Shared LLM clients and their circuit breaker state for this worker process"""
+    return get_provider_registry().stats()
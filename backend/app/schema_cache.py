@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+EXCLUDED_COLUMNS_PATH = os.path.join(os.path.dirname(__file__), "excluded_columns.txt")
+
+
+class SchemaCache:
+    """Process-wide cache of the students table schema.
+
+    INFORMATION_SCHEMA.COLUMNS is only queried again when the table's
+    CREATE_TIME/UPDATE_TIME marker changes (checked at most every
+    ``check_interval`` seconds) or after ``ttl`` seconds. The exclusion file is
+    re-read only when its mtime changes. The rendered prompt schema is kept
+    so repeat questions reuse the exact same string.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        table: str = "students",
+        ttl: float = 600,
+        check_interval: float = 30,
+        excluded_columns_path: str = EXCLUDED_COLUMNS_PATH,
+    ):
+        self.db_manager = db_manager
+        self.table = table
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.excluded_columns_path = excluded_columns_path
+
+        self._lock = threading.RLock()
+        self._columns: Optional[List[Tuple[str, str, str]]] = None
+        self._marker = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._rendered: Optional[str] = None
+        self._excluded: set = set()
+        self._excluded_mtime = None
+        self._excluded_missing = False
+
+        self._hits = 0
+        self._misses = 0
+        self._marker_checks = 0
+
+    def fetch_marker(self):
+        conn = self.db_manager.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT CREATE_TIME, UPDATE_TIME
+                    FROM INFORMATION_SCHEMA.TABLES
+                    WHERE TABLE_NAME = %s AND TABLE_SCHEMA = %s
+                """, (self.table, self.db_manager.config['database']))
+                rows = cursor.fetchall()
+                return tuple(rows[0]) if rows else None
+        finally:
+            conn.close()
+
+    def _fetch_columns(self) -> List[Tuple[str, str, str]]:
+        conn = self.db_manager.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE
+                    FROM INFORMATION_SCHEMA.COLUMNS
+                    WHERE TABLE_NAME = %s AND TABLE_SCHEMA = %s
+                    ORDER BY ORDINAL_POSITION
+                """, (self.table, self.db_manager.config['database']))
+                return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def _refresh_excluded(self):
+        try:
+            mtime = os.stat(self.excluded_columns_path).st_mtime
+        except OSError as e:
+            if not self._excluded_missing:
+                print(f"Warning: Failed to load excluded_columns.txt - {e}")
+                self._excluded_missing = True
+                self._excluded, self._excluded_mtime = set(), None
+                self._rendered = None
+            return
+        self._excluded_missing = False
+        if mtime == self._excluded_mtime:
+            return
+        try:
+            with open(self.excluded_columns_path, "r") as f:
+                self._excluded = {line.strip() for line in f if line.strip() and not line.startswith("#")}
+        except Exception as e:
+            print(f"Warning: Failed to load excluded_columns.txt - {e}")
+            self._excluded = set()
+        self._excluded_mtime = mtime
+        self._rendered = None
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._columns is not None and now - self._loaded_at < self.ttl:
+            if now - self._checked_at < self.check_interval:
+                self._hits += 1
+                return
+            self._checked_at = now
+            self._marker_checks += 1
+            marker = self.fetch_marker()
+            if marker == self._marker:
+                self._hits += 1
+                return
+        else:
+            marker = self.fetch_marker()
+
+        self._misses += 1
+        self._columns = self._fetch_columns()
+        self._marker = marker
+        self._loaded_at = self._checked_at = now
+        self._rendered = None
+
+    def get_columns(self) -> List[Tuple[str, str, str]]:
+        """All (name, data_type, column_type) tuples, exclusions not applied."""
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._columns)
+
+    def get_column_names(self) -> List[str]:
+        return [col[0] for col in self.get_columns()]
+
+    def get_excluded_columns(self) -> set:
+        with self._lock:
+            self._refresh_excluded()
+            return set(self._excluded)
+
+    def get_prompt_schema(self) -> str:
+        with self._lock:
+            self._ensure_fresh()
+            self._refresh_excluded()
+            if self._rendered is None:
+                self._rendered = self._render()
+            return self._rendered
+
+    def _render(self) -> str:
+        schema_str = f"Table: {self.table}\nColumns:\n"
+        for column_name, data_type, column_type in self._columns:
+            if column_name not in self._excluded:
+                schema_str += f"- {column_name}: {data_type} ({column_type})\n"
+        return schema_str
+
+    def invalidate(self):
+        with self._lock:
+            self._columns = None
+            self._rendered = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "table": self.table,
+                "loaded": self._columns is not None,
+                "column_count": len(self._columns or []),
+                "excluded_count": len(self._excluded),
+                "rendered": self._rendered is not None,
+                "hits": self._hits,
+                "misses": self._misses,
+                "marker_checks": self._marker_checks,
+            }
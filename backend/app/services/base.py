@@ -1,7 +1,32 @@
 import re
 import os
-from typing import List, Dict, Optional
+import asyncio
+import functools
+from typing import AsyncIterator, List, Dict, Optional
 from abc import ABC, abstractmethod
+
+from app.config import settings
+from app.services.result_summary import condense_results
+
+class FallbackText(str):
+    """Canned text returned in place of a failed LLM call; never cached."""
+
+
+def fallback_explanation(results: List[Dict], error: Exception) -> FallbackText:
+    print(f"⚠️ Explanation generation failed: {str(error)}")
+
+    if results:
+        first_result = results[0]
+        for key, value in first_result.items():
+            return FallbackText(f"The query returned '{value}' as the most frequent value in the '{key}' column.")
+    return FallbackText("The query executed successfully, but no explanation could be generated due to a system error.")
+
+
+@functools.lru_cache(maxsize=None)
+def _read_template(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
 class BaseLLMService(ABC):
     def __init__(self):
         base_path = os.path.join(os.path.dirname(__file__), "..", "prompts")
@@ -9,8 +34,26 @@ class BaseLLMService(ABC):
         self.explanation_template = self._load_template(os.path.join(base_path, "explanation_prompt.txt"))
 
     def _load_template(self, path: str) -> str:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        # Read from disk once per process, not once per service instance
+        return _read_template(os.path.normpath(path))
+
+    def _build_sql_prompt(self, natural_language: str, schema: str) -> str:
+        return self.sql_prompt_template.format(
+            schema=schema,
+            user_question=natural_language
+        )
+
+    def _clean_sql(self, raw_text: str) -> str:
+        sql_query = re.sub(r'```sql|```', '', raw_text).strip()
+        return sql_query if sql_query.endswith(';') else f"{sql_query};"
+
+    def _condense_results(self, results: List[Dict]) -> str:
+        """Results as prompt text, summarized so the prompt stays within the token budget."""
+        return condense_results(
+            results,
+            token_budget=settings.explanation_token_budget,
+            sample_rows=settings.explanation_sample_rows
+        )
 
     @abstractmethod
     def generate_sql_query(self, natural_language: str, schema: str) -> str:
@@ -20,3 +63,39 @@ class BaseLLMService(ABC):
     def explain_results(self, query: str, results: List[Dict], question: str) -> str:
         pass
 
+    # Async variants. Providers override these with their native async
+    # clients; the defaults keep the event loop free by using a worker thread.
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        return await asyncio.to_thread(self.generate_sql_query, natural_language, schema)
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        return await asyncio.to_thread(self.explain_results, query, results, question)
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await asyncio.to_thread(self._generate_text, prompt, max_tokens, temperature)
+
+    # Streaming. Providers override astream_text (and stream_explanation when
+    # they post-process explanations) with their native streaming mode; the
+    # defaults generate the whole text first and emit it word by word.
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> AsyncIterator[str]:
+        text = await self.agenerate_text(prompt, max_tokens, temperature)
+        for chunk in re.findall(r"\S+\s*", text):
+            yield chunk
+
+    async def stream_sql(self, natural_language: str, schema: str) -> AsyncIterator[str]:
+        """Yield raw SQL text as the model writes it; pass the joined text through _clean_sql."""
+        prompt = self._build_sql_prompt(natural_language, schema)
+        async for chunk in self.astream_text(prompt, max_tokens=200, temperature=0.1):
+            yield chunk
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str) -> AsyncIterator[str]:
+        """Yield the explanation in small chunks as it becomes available."""
+        explanation = await self.aexplain_results(query, results, question)
+        # Chunks of a fallback stay marked so the caller does not cache them
+        wrap = FallbackText if isinstance(explanation, FallbackText) else str
+        for chunk in re.findall(r"\S+\s*", explanation):
+            yield wrap(chunk)
+
+    @abstractmethod
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        pass
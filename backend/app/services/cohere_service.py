@@ -1,4 +1,3 @@
-import re
 from typing import Dict, List
 
 import cohere
@@ -9,44 +8,77 @@ class CohereService(BaseLLMService):
     def __init__(self, api_key: str):
         super().__init__()
         self.co = cohere.Client(api_key)
+        self.async_co = cohere.AsyncClient(api_key)
 
-    def generate_sql_query(self, natural_language: str, schema: str) -> str:
-        prompt = self.sql_prompt_template.format(
-            schema=schema,
-            user_question=natural_language
-        )
-
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
         response = self.co.generate(
             model="command",
             prompt=prompt,
-            max_tokens=200,
-            temperature=0.1
+            max_tokens=max_tokens,
+            temperature=temperature
         )
+        return response.generations[0].text.strip()
 
-        raw_text = response.generations[0].text.strip()
-        print(f"🛠 [Cohere] Generated raw SQL: {raw_text}")
-        sql_query = re.sub(r'```sql|```', '', raw_text).strip()
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        response = await self.async_co.generate(
+            model="command",
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.generations[0].text.strip()
 
-        if not sql_query.endswith(';'):
-            sql_query += ';'
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        async for event in self.async_co.generate_stream(
+            model="command",
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            if event.event_type == "text-generation":
+                yield event.text
+            elif event.event_type == "stream-error":
+                raise ValueError(f"Cohere stream error: {event.err}")
 
+    def _finish_sql(self, raw_text: str) -> str:
+        print(f"🛠 [Cohere] Generated raw SQL: {raw_text}")
+        sql_query = self._clean_sql(raw_text)
         print(f"✅ [Cohere] Final SQL query: {sql_query}")
         return sql_query
 
-    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
-        prompt = self.explanation_template.format(
+    def _build_explanation_prompt(self, query: str, results: List[Dict], question: str) -> str:
+        return self.explanation_template.format(
             user_question=question,
             sql_query=query,
-            sql_results=results
+            sql_results=self._condense_results(results)
         )
 
-        response = self.co.generate(
-            model="command",
-            prompt=prompt,
-            max_tokens=300,
-            temperature=0.2
-        )
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
+        raw_text = self._generate_text(prompt, max_tokens=200, temperature=0.1)
+        return self._finish_sql(raw_text)
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
+        raw_text = await self.agenerate_text(prompt, max_tokens=200, temperature=0.1)
+        return self._finish_sql(raw_text)
 
-        explanation = response.generations[0].text.strip()
+    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
+        prompt = self._build_explanation_prompt(query, results, question)
+        explanation = self._generate_text(prompt, max_tokens=300, temperature=0.2)
         print(f"📘 [Cohere] Generated explanation: {explanation}")
         return explanation
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        prompt = self._build_explanation_prompt(query, results, question)
+        explanation = await self.agenerate_text(prompt, max_tokens=300, temperature=0.2)
+        print(f"📘 [Cohere] Generated explanation: {explanation}")
+        return explanation
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str):
+        prompt = self._build_explanation_prompt(query, results, question)
+        parts = []
+        async for chunk in self.astream_text(prompt, max_tokens=300, temperature=0.2):
+            parts.append(chunk)
+            yield chunk
+        print(f"📘 [Cohere] Generated explanation: {''.join(parts).strip()}")
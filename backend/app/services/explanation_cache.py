@@ -0,0 +1,42 @@
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional
+
+from app.cache import LRUCache
+from app.config import settings
+from app.result_cache import canonical_sql
+from app.services.sql_cache import normalize_question
+
+
+def results_digest(results: List[Dict]) -> str:
+    """Stable hash of the result rows; column order within a row does not matter."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in results:
+        digest.update(json.dumps(row, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def explanation_cache_key(sql_query: str, results: List[Dict], question: str) -> str:
+    raw = f"{canonical_sql(sql_query)}\x1f{results_digest(results)}\x1f{normalize_question(question)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+_explanation_cache: Optional[LRUCache] = None
+_explanation_cache_lock = threading.Lock()
+
+
+def get_explanation_cache() -> LRUCache:
+    """Process-wide result-explanation cache configured from settings."""
+    global _explanation_cache
+    if _explanation_cache is None:
+        with _explanation_cache_lock:
+            if _explanation_cache is None:
+                _explanation_cache = LRUCache(
+                    max_entries=settings.explanation_cache_max_entries,
+                    ttl=settings.explanation_cache_ttl,
+                    max_bytes=settings.explanation_cache_max_bytes,
+                    sizeof=len
+                )
+    return _explanation_cache
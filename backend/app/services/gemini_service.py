@@ -1,4 +1,3 @@
-import re
 from typing import List, Dict
 import google.generativeai as genai
 
@@ -17,56 +16,86 @@ class GeminiService(BaseLLMService):
             {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
         ]
 
+    def _generation_config(self, max_tokens: int, temperature: float):
+        return genai.types.GenerationConfig(
+            max_output_tokens=max_tokens,
+            temperature=temperature
+        )
+
+    def _response_text(self, response) -> str:
+        if response.candidates and response.candidates[0].finish_reason == 2:
+            raise ValueError("Content blocked by safety filters")
+        if not response.text:
+            raise ValueError("Empty response from Gemini API")
+        return response.text.strip()
+
     def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
         try:
             response = self.model.generate_content(
                 prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=max_tokens,
-                    temperature=temperature
-                ),
+                generation_config=self._generation_config(max_tokens, temperature),
                 safety_settings=self.safety_settings
             )
+            return self._response_text(response)
 
-            if response.candidates and response.candidates[0].finish_reason == 2:
-                raise ValueError("Content blocked by safety filters")
-            if not response.text:
-                raise ValueError("Empty response from Gemini API")
-            return response.text.strip()
+        except Exception as e:
+            print(f"⚠️ Gemini API Error: {str(e)}")
+            raise
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(max_tokens, temperature),
+                safety_settings=self.safety_settings
+            )
+            return self._response_text(response)
 
         except Exception as e:
             print(f"⚠️ Gemini API Error: {str(e)}")
             raise
 
-    def generate_sql_query(self, natural_language: str, schema: str) -> str:
-        prompt = self.sql_prompt_template.format(
-            schema=schema,
-            user_question=natural_language
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self._generation_config(max_tokens, temperature),
+            safety_settings=self.safety_settings,
+            stream=True
         )
+        async for chunk in response:
+            if chunk.candidates and chunk.candidates[0].finish_reason == 2:
+                raise ValueError("Content blocked by safety filters")
+            if chunk.parts:
+                yield chunk.text
+
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
         print(f"📝 [Gemini] SQL generation prompt:\n{prompt}")
 
         try:
             raw_text = self._generate_text(prompt, max_tokens=200, temperature=0.1)
             print(f"🛠 [Gemini] Generated raw SQL: {raw_text}")
-            sql_query = re.sub(r'```sql|```', '', raw_text).strip()
-            return sql_query if sql_query.endswith(';') else sql_query + ';'
+            return self._clean_sql(raw_text)
         except Exception as e:
             print(f"⚠️ SQL generation failed: {str(e)}")
             raise ValueError(f"Failed to generate SQL query: {str(e)}")
 
-    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
-        try:
-            if not results:
-                return "No results were returned from the query."
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
+        print(f"📝 [Gemini] SQL generation prompt:\n{prompt}")
 
-            formatted_results = []
-            for idx, result in enumerate(results):
-                row_str = ", ".join(f"{k}: {v}" for k, v in result.items())
-                formatted_results.append(f"Row {idx + 1}: {row_str}")
+        try:
+            raw_text = await self.agenerate_text(prompt, max_tokens=200, temperature=0.1)
+            print(f"🛠 [Gemini] Generated raw SQL: {raw_text}")
+            return self._clean_sql(raw_text)
+        except Exception as e:
+            print(f"⚠️ SQL generation failed: {str(e)}")
+            raise ValueError(f"Failed to generate SQL query: {str(e)}")
 
-            results_str = "\n".join(formatted_results)
+    def _build_explanation_prompt(self, query: str, results: List[Dict], question: str) -> str:
+        results_str = self._condense_results(results)
 
-            prompt = f"""
+        return f"""
 You are a data analyst.
 
 Analyze the following SQL query result and provide a clear, factual summary.
@@ -79,22 +108,59 @@ Analyze the following SQL query result and provide a clear, factual summary.
 Explain what the result means in a neutral tone suitable for a business report.
 """
 
-            print(f"📝 [Gemini] Explanation prompt:\n{prompt}")
-
-            explanation = self._generate_text(prompt, max_tokens=300, temperature=0.3)
+    def _finish_explanation(self, explanation: str) -> str:
+        if explanation.lower().startswith("here is"):
+            explanation = explanation.split(":", 1)[-1].strip()
 
-            if explanation.lower().startswith("here is"):
-                explanation = explanation.split(":", 1)[-1].strip()
-
-            print(f"📘 [Gemini] Generated explanation: {explanation}")
-            return explanation
+        print(f"📘 [Gemini] Generated explanation: {explanation}")
+        return explanation
 
+    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
+        if not results:
+            return "No results were returned from the query."
+        # Failures propagate so the provider guard and fallback chain see them
+        prompt = self._build_explanation_prompt(query, results, question)
+        print(f"📝 [Gemini] Explanation prompt:\n{prompt}")
+        explanation = self._generate_text(prompt, max_tokens=300, temperature=0.3)
+        return self._finish_explanation(explanation)
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        if not results:
+            return "No results were returned from the query."
+        prompt = self._build_explanation_prompt(query, results, question)
+        print(f"📝 [Gemini] Explanation prompt:\n{prompt}")
+        explanation = await self.agenerate_text(prompt, max_tokens=300, temperature=0.3)
+        return self._finish_explanation(explanation)
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str):
+        if not results:
+            yield "No results were returned from the query."
+            return
+
+        prompt = self._build_explanation_prompt(query, results, question)
+        print(f"📝 [Gemini] Explanation prompt:\n{prompt}")
+        # The opening is held back until it's clear whether it is a "Here is ...:" preamble
+        pending, parts, emitted = "", [], False
+        try:
+            async for chunk in self.astream_text(prompt, max_tokens=300, temperature=0.3):
+                parts.append(chunk)
+                if emitted:
+                    yield chunk
+                    continue
+                pending += chunk
+                head = pending.lstrip().lower()
+                if "here is".startswith(head) or (head.startswith("here is") and ":" not in pending):
+                    continue
+                emitted = True
+                opening = pending.split(":", 1)[-1].lstrip() if head.startswith("here is") else pending
+                if opening:
+                    yield opening
         except Exception as e:
-            print(f"⚠️ Explanation generation failed: {str(e)}")
-
-            # Fallback logic
-            if results:
-                first_result = results[0]
-                for key, value in first_result.items():
-                    return f"The query returned '{value}' as the most frequent value in the '{key}' column."
-            return "The query executed successfully, but no explanation could be generated due to a system error."
+            # Raised either way: a partial answer must not be kept as complete
+            print(f"⚠️ Explanation stream {'interrupted' if emitted else 'failed'}: {str(e)}")
+            raise
+
+        if not emitted and pending:
+            yield self._finish_explanation(pending)
+        else:
+            print(f"📘 [Gemini] Generated explanation: {''.join(parts).strip()}")
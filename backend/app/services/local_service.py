@@ -1,51 +1,112 @@
-import re
+import json
 from typing import Dict, List
-import requests
 
+from app.http_clients import get_async_client, get_session
 from app.services.base import BaseLLMService
 
 
 
 class LocalLLMService(BaseLLMService):
-    def __init__(self, base_url: str = "http://localhost:1234/v1"):
+    def __init__(self, base_url: str = "http://localhost:1234/v1", timeout: float = 120):
         super().__init__()
         self.base_url = base_url  # LM Studio/Ollama endpoint
+        self.timeout = timeout  # hard ceiling; ProviderGuard applies the adaptive timeout
+
+    def _payload(self, prompt: str, max_tokens: int, temperature: float) -> dict:
+        return {
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
 
     def _call_local_api(self, prompt: str, max_tokens: int = 200, temperature: float = 0.1) -> str:
         try:
-            response = requests.post(
+            # Pooled keep-alive session instead of a new TCP connection per call
+            response = get_session(self.base_url).post(
                 f"{self.base_url}/chat/completions",
-                json={
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                },
-                timeout=120,
+                json=self._payload(prompt, max_tokens, temperature),
+                timeout=self.timeout,
             )
             response.raise_for_status()
             return response.json()["choices"][0]["message"]["content"]
         except Exception as e:
             raise ValueError(f"Local LLM API error: {str(e)}")
 
-    def generate_sql_query(self, natural_language: str, schema: str) -> str:
-        prompt = self.sql_prompt_template.format(
-            schema=schema,
-            user_question=natural_language
+    async def _acall_local_api(self, prompt: str, max_tokens: int = 200, temperature: float = 0.1) -> str:
+        try:
+            response = await get_async_client(self.base_url).post(
+                f"{self.base_url}/chat/completions",
+                json=self._payload(prompt, max_tokens, temperature),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            raise ValueError(f"Local LLM API error: {str(e)}")
+
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        # OpenAI-compatible server-sent events: "data: {...}" lines ending with "data: [DONE]"
+        payload = {**self._payload(prompt, max_tokens, temperature), "stream": True}
+        try:
+            async with get_async_client(self.base_url).stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                timeout=self.timeout,
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    token = (choices[0].get("delta") or {}).get("content")
+                    if token:
+                        yield token
+        except Exception as e:
+            raise ValueError(f"Local LLM API error: {str(e)}")
+
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return self._call_local_api(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await self._acall_local_api(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    def _build_explanation_prompt(self, query: str, results: List[Dict], question: str) -> str:
+        return self.explanation_template.format(
+            user_question=question,
+            sql_query=query,
+            sql_results=self._condense_results(results)
         )
+
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
         print(f"Here is the prompt: {prompt}")
 
         raw_text = self._call_local_api(prompt, max_tokens=200, temperature=0.1)
-        sql_query = re.sub(r'```sql|```', '', raw_text).strip()
-        return sql_query if sql_query.endswith(';') else f"{sql_query};"
+        return self._clean_sql(raw_text)
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        prompt = self._build_sql_prompt(natural_language, schema)
+        print(f"Here is the prompt: {prompt}")
+
+        raw_text = await self._acall_local_api(prompt, max_tokens=200, temperature=0.1)
+        return self._clean_sql(raw_text)
 
     def explain_results(self, query: str, results: List[Dict], question: str) -> str:
-        results_str = "\n".join([str(r) for r in results])
-        prompt = self.explanation_template.format(
-            user_question=question,
-            sql_query=query,
-            sql_results=results_str
-        )
+        prompt = self._build_explanation_prompt(query, results, question)
         print(f"Here is the prompt: {prompt}")
         return self._call_local_api(prompt, max_tokens=300, temperature=0.2)
 
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        prompt = self._build_explanation_prompt(query, results, question)
+        print(f"Here is the prompt: {prompt}")
+        return await self._acall_local_api(prompt, max_tokens=300, temperature=0.2)
 
+    async def stream_explanation(self, query: str, results: List[Dict], question: str):
+        prompt = self._build_explanation_prompt(query, results, question)
+        print(f"Here is the prompt: {prompt}")
+        async for chunk in self.astream_text(prompt, max_tokens=300, temperature=0.2):
+            yield chunk
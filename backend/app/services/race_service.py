@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.services.base import BaseLLMService
+from app.sql_validation import validate_select
+
+SQLValidator = Callable[[str], Awaitable[Optional[str]]]
+
+_stats_lock = threading.Lock()
+_race_stats = {"races": 0, "wins": Counter(), "invalid": Counter(), "errors": Counter(), "all_failed": 0}
+
+
+def race_stats() -> Dict[str, object]:
+    with _stats_lock:
+        return {
+            "races": _race_stats["races"],
+            "wins": dict(_race_stats["wins"]),
+            "invalid": dict(_race_stats["invalid"]),
+            "errors": dict(_race_stats["errors"]),
+            "all_failed": _race_stats["all_failed"],
+        }
+
+
+def _count(kind: str, provider: Optional[str] = None):
+    with _stats_lock:
+        if provider is None:
+            _race_stats[kind] += 1
+        else:
+            _race_stats[kind][provider] += 1
+
+
+class RaceLLMService(BaseLLMService):
+    """Fans SQL generation out to several providers; the first valid query wins.
+
+    Each candidate is checked syntactically (single read-only SELECT) and then
+    by the optional async ``validator`` (e.g. an EXPLAIN against the live
+    database). Remaining requests are cancelled as soon as one passes. When
+    the validator returns a statement (check_query's CheckedSQL), that is the
+    query handed back, so the route does not check it a second time.
+    Explanations and free text go to the first provider in the list.
+    """
+
+    def __init__(self, services: Dict[str, BaseLLMService], validator: Optional[SQLValidator] = None):
+        super().__init__()
+        if not services:
+            raise ValueError("Race mode needs at least one configured provider")
+        self.services = services
+        self.validator = validator
+        self.primary = next(iter(services.values()))
+
+    async def _validated(self, name: str, service: BaseLLMService, natural_language: str, schema: str):
+        try:
+            sql_query = await service.agenerate_sql_query(natural_language, schema)
+        except Exception:
+            _count("errors", name)
+            raise
+        try:
+            validate_select(sql_query)
+            if self.validator is not None:
+                sql_query = await self.validator(sql_query) or sql_query
+        except Exception:
+            _count("invalid", name)
+            raise
+        return name, sql_query
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        _count("races")
+        tasks = [
+            asyncio.create_task(self._validated(name, service, natural_language, schema))
+            for name, service in self.services.items()
+        ]
+        errors: List[str] = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    winner, sql_query = await finished
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                _count("wins", winner)
+                print(f"🏁 [Race] {winner} returned the first valid SQL")
+                return sql_query
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        _count("all_failed")
+        raise ValueError(f"No provider produced a valid SQL query: {'; '.join(errors)}")
+
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        # Sync callers get a sequential first-valid fallback
+        errors = []
+        for name, service in self.services.items():
+            try:
+                sql_query = service.generate_sql_query(natural_language, schema)
+                validate_select(sql_query)
+                return sql_query
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
+        raise ValueError(f"No provider produced a valid SQL query: {'; '.join(errors)}")
+
+    def explain_results(self, query, results, question) -> str:
+        return self.primary.explain_results(query, results, question)
+
+    async def aexplain_results(self, query, results, question) -> str:
+        return await self.primary.aexplain_results(query, results, question)
+
+    async def stream_sql(self, natural_language: str, schema: str):
+        # Only a validated winner is worth showing, so the race result comes as one chunk
+        yield await self.agenerate_sql_query(natural_language, schema)
+
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        async for chunk in self.primary.astream_text(prompt, max_tokens, temperature):
+            yield chunk
+
+    async def stream_explanation(self, query, results, question):
+        async for chunk in self.primary.stream_explanation(query, results, question):
+            yield chunk
+
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return self.primary._generate_text(prompt, max_tokens, temperature)
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await self.primary.agenerate_text(prompt, max_tokens, temperature)
@@ -0,0 +1,172 @@
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_openai import ChatOpenAI
+
+from app.config import settings
+from app.llm_service import LLMService
+from app.services.base import BaseLLMService
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.race_service import RaceLLMService
+from app.services.resilience import FallbackLLMService, ProviderGuard, ResilientLLMService, fallback_stats
+
+PROVIDERS = ("cohere", "gemini", "local")
+
+
+async def check_sql(sql_query: str) -> str:
+    """Race-mode validator: the first query that passes the database's checks and EXPLAIN wins."""
+    from app.database import get_shared_async_db_manager
+
+    return await get_shared_async_db_manager().check_query(sql_query)
+
+
+class ProviderRegistry:
+    """LLM clients built once per process and shared by every request.
+
+    Each provider gets one client (and one set of loaded prompt templates)
+    wrapped in a ProviderGuard: adaptive timeouts, hedged requests and a
+    circuit breaker that learns provider health from real calls. With
+    ``fallback_providers`` set, a request for one provider falls through to
+    the next healthy one.
+    """
+
+    def __init__(
+        self,
+        cohere_api_key: Optional[str] = None,
+        google_api_key: Optional[str] = None,
+        local_api_url: Optional[str] = "http://localhost:1234/v1",
+        race_providers: str = "cohere,gemini,local",
+        fallback_providers: str = "",
+        sql_validator=None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        guard_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.credentials = (cohere_api_key, google_api_key, local_api_url)
+        self.race_providers = self._names(race_providers)
+        self.fallback_providers = self._names(fallback_providers)
+        self.sql_validator = sql_validator
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.guard_options = guard_options or {}
+
+        self._lock = threading.RLock()
+        self._services: Dict[str, BaseLLMService] = {}
+        self._llm_services: Dict[str, LLMService] = {}
+        self._guards: Dict[str, ProviderGuard] = {}
+        self._chat_model = None
+
+    @staticmethod
+    def _names(providers: str):
+        return [p.strip().lower() for p in (providers or "").split(",") if p.strip()]
+
+    def guard(self, name: str) -> ProviderGuard:
+        with self._lock:
+            if name not in self._guards:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+                self._guards[name] = ProviderGuard(name, breaker, **self.guard_options)
+            return self._guards[name]
+
+    def service(self, provider: str) -> BaseLLMService:
+        """Shared client for a single provider, wrapped in its ProviderGuard."""
+        provider = provider.lower()
+        with self._lock:
+            if provider not in self._services:
+                raw = LLMService._build_service(provider, *self.credentials)
+                self._services[provider] = ResilientLLMService(raw, self.guard(provider))
+            return self._services[provider]
+
+    def _available(self, names) -> Dict[str, BaseLLMService]:
+        services = {}
+        for name in names:
+            try:
+                services[name] = self.service(name)
+            except ValueError as e:
+                print(f"⚠️ Skipping {name}: {str(e)}")
+        return services
+
+    def _fallback_service(self, provider: str) -> BaseLLMService:
+        primary = self.service(provider)
+        others = self._available([name for name in self.fallback_providers if name != provider])
+        if not others:
+            return primary
+        return FallbackLLMService({provider: primary, **others})
+
+    def get(self, provider: str) -> LLMService:
+        provider = provider.lower()
+        with self._lock:
+            if provider not in self._llm_services:
+                if provider == "race":
+                    service = RaceLLMService(self._available(self.race_providers), validator=self.sql_validator)
+                else:
+                    service = self._fallback_service(provider)
+                self._llm_services[provider] = LLMService(provider=provider, service=service)
+            return self._llm_services[provider]
+
+    def chat_model(self) -> ChatOpenAI:
+        """OpenRouter chat model used by the LangChain query endpoint."""
+        with self._lock:
+            if self._chat_model is None:
+                self._chat_model = ChatOpenAI(
+                    model="anthropic/claude-3-haiku",
+                    openai_api_base="https://openrouter.ai/api/v1",
+                    openai_api_key=settings.openai_api_key,
+                    temperature=0.1,
+                    max_tokens=200,
+                )
+            return self._chat_model
+
+    def warm_up(self):
+        """Build every provider that has credentials so the first request doesn't pay for it."""
+        for provider in PROVIDERS:
+            try:
+                self.service(provider)
+            except Exception as e:
+                print(f"⚠️ {provider} provider unavailable: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            guards = list(self._guards.values())
+        return {
+            "providers": sorted(self._services),
+            "guards": {guard.name: guard.stats() for guard in guards},
+            "fallbacks": fallback_stats(),
+        }
+
+
+_registry: Optional[ProviderRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def init_provider_registry() -> ProviderRegistry:
+    """Build the process-wide registry from settings and create its clients."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProviderRegistry(
+                cohere_api_key=settings.cohere_api_key,
+                google_api_key=settings.google_api_key,
+                local_api_url=settings.local_llm_url,
+                race_providers=settings.race_providers,
+                fallback_providers=settings.llm_fallback_providers,
+                sql_validator=check_sql,
+                failure_threshold=settings.llm_breaker_failure_threshold,
+                reset_timeout=settings.llm_breaker_reset_timeout,
+                guard_options={
+                    "min_timeout": settings.llm_timeout_min,
+                    "max_timeout": settings.llm_timeout_max,
+                    "timeout_multiplier": settings.llm_timeout_multiplier,
+                    "window": settings.llm_latency_window,
+                    "min_samples": settings.llm_latency_min_samples,
+                    "hedging": settings.llm_hedging_enabled,
+                    "hedge_percentile": settings.llm_hedge_percentile,
+                },
+            )
+            _registry.warm_up()
+    return _registry
+
+
+def get_provider_registry() -> ProviderRegistry:
+    if _registry is None:
+        return init_provider_registry()
+    return _registry
@@ -0,0 +1,359 @@
+import asyncio
+import math
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.base import BaseLLMService
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class ProviderTimeoutError(TimeoutError):
+    pass
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (seconds) with percentile lookups."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class ProviderGuard:
+    """Adaptive timeout, hedging and circuit breaking for one provider.
+
+    Latencies are tracked per operation ("sql", "explain", "text", ...). Once
+    ``min_samples`` calls have completed, the timeout becomes
+    ``p99 * timeout_multiplier`` clamped to [min_timeout, max_timeout], and a
+    second identical request is started when the first has not answered by
+    the ``hedge_percentile`` latency; whichever finishes first wins. Timeouts
+    are fed back as latency samples so a slowing provider widens its own
+    timeout instead of tripping forever.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        min_timeout: float = 5,
+        max_timeout: float = 120,
+        timeout_multiplier: float = 3,
+        window: int = 200,
+        min_samples: int = 20,
+        hedging: bool = True,
+        hedge_percentile: float = 0.95,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.counters = Counter()
+
+    def latency(self, operation: str) -> LatencyTracker:
+        with self._lock:
+            if operation not in self._latency:
+                self._latency[operation] = LatencyTracker(self.window)
+            return self._latency[operation]
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+
+    def timeout(self, operation: str) -> float:
+        tracker = self.latency(operation)
+        if len(tracker) < self.min_samples:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, tracker.percentile(0.99) * self.timeout_multiplier))
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        tracker = self.latency(operation)
+        if not self.hedging or len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    async def _hedged(self, operation: str, factory: Callable[[], Awaitable], delay: Optional[float]):
+        first = asyncio.ensure_future(factory())
+        if delay is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = asyncio.ensure_future(factory())
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in (first, second):
+                if not task.done():
+                    task.cancel()
+
+    async def call(self, operation: str, factory: Callable[[], Awaitable]) -> Any:
+        """Run ``factory()`` (a fresh awaitable per attempt) under this provider's policy."""
+        timeout, hedge_delay = self.timeout(operation), self.hedge_delay(operation)
+        # Nothing may raise between taking a (half-open trial) slot and the try below
+        self.breaker.check()
+        self._count("calls")
+        started = time.monotonic()
+        recorded = False
+        try:
+            result = await asyncio.wait_for(self._hedged(operation, factory, hedge_delay), timeout)
+            self.latency(operation).record(time.monotonic() - started)
+            self._count("successes")
+            self.breaker.record_success()
+            recorded = True
+            return result
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            self.latency(operation).record(timeout)
+            self.breaker.record_failure()
+            recorded = True
+            raise ProviderTimeoutError(f"{self.name} did not answer within {timeout:.1f}s")
+        except Exception:
+            self._count("failures")
+            self.breaker.record_failure()
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                # Cancelled by the caller (e.g. a race loser); no verdict on provider health
+                self.breaker.release()
+
+    def call_sync(self, operation: str, func: Callable, *args, **kwargs) -> Any:
+        """Blocking variant: circuit breaking and latency tracking only."""
+        self.breaker.check()
+        self._count("calls")
+        started = time.monotonic()
+        recorded = False
+        try:
+            result = func(*args, **kwargs)
+            self.latency(operation).record(time.monotonic() - started)
+            self._count("successes")
+            self.breaker.record_success()
+            recorded = True
+            return result
+        except Exception:
+            self._count("failures")
+            self.breaker.record_failure()
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            operations = list(self._latency)
+        return {
+            **{key: counters.get(key, 0) for key in ("calls", "successes", "failures", "timeouts", "hedges", "hedge_wins")},
+            "breaker": self.breaker.stats(),
+            "operations": {
+                op: {**self.latency(op).stats(), "timeout": self.timeout(op), "hedge_after": self.hedge_delay(op)}
+                for op in operations
+            },
+        }
+
+
+class ResilientLLMService(BaseLLMService):
+    """Runs every call to ``service`` through the provider's ProviderGuard."""
+
+    def __init__(self, service: BaseLLMService, guard: ProviderGuard):
+        super().__init__()
+        self.service = service
+        self.guard = guard
+
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        return self.guard.call_sync("sql", self.service.generate_sql_query, natural_language, schema)
+
+    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
+        return self.guard.call_sync("explain", self.service.explain_results, query, results, question)
+
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return self.guard.call_sync("text", self.service._generate_text, prompt, max_tokens, temperature)
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        return await self.guard.call("sql", lambda: self.service.agenerate_sql_query(natural_language, schema))
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        return await self.guard.call("explain", lambda: self.service.aexplain_results(query, results, question))
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await self.guard.call("text", lambda: self.service.agenerate_text(prompt, max_tokens, temperature))
+
+    async def _guarded_stream(self, stream):
+        # Streams can't be hedged or retried once tokens have been sent; breaker only
+        breaker = self.guard.breaker
+        breaker.check()
+        recorded = False
+        try:
+            async for chunk in stream:
+                yield chunk
+            breaker.record_success()
+            recorded = True
+        except Exception:
+            breaker.record_failure()
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                breaker.release()
+
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        async for chunk in self._guarded_stream(self.service.astream_text(prompt, max_tokens, temperature)):
+            yield chunk
+
+    async def stream_sql(self, natural_language: str, schema: str):
+        async for chunk in self._guarded_stream(self.service.stream_sql(natural_language, schema)):
+            yield chunk
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str):
+        async for chunk in self._guarded_stream(self.service.stream_explanation(query, results, question)):
+            yield chunk
+
+
+_fallback_lock = threading.Lock()
+_fallback_counts = Counter()
+
+
+def fallback_stats() -> Dict[str, int]:
+    """How often each provider answered on behalf of another one."""
+    with _fallback_lock:
+        return dict(_fallback_counts)
+
+
+class FallbackLLMService(BaseLLMService):
+    """Tries ``services`` in order, moving on when a provider is open, times out or fails."""
+
+    def __init__(self, services: Dict[str, BaseLLMService]):
+        super().__init__()
+        if not services:
+            raise ValueError("At least one provider is required")
+        self.services = services
+        self.primary = next(iter(services))
+
+    def _used(self, name: str):
+        if name != self.primary:
+            with _fallback_lock:
+                _fallback_counts[f"{self.primary}->{name}"] += 1
+            print(f"⚠️ {self.primary} unavailable, answered by {name}")
+
+    def _first(self, method: str, *args):
+        errors = []
+        for name, service in self.services.items():
+            try:
+                result = getattr(service, method)(*args)
+            except Exception as e:
+                errors.append(e)
+                continue
+            self._used(name)
+            return result
+        raise self._all_failed(errors)
+
+    async def _afirst(self, method: str, *args):
+        errors = []
+        for name, service in self.services.items():
+            try:
+                result = await getattr(service, method)(*args)
+            except Exception as e:
+                errors.append(e)
+                continue
+            self._used(name)
+            return result
+        raise self._all_failed(errors)
+
+    def _all_failed(self, errors: List[Exception]) -> Exception:
+        if all(isinstance(e, CircuitOpenError) for e in errors):
+            return CircuitOpenError("All LLM providers are unavailable")
+        return errors[0]
+
+    def generate_sql_query(self, natural_language: str, schema: str) -> str:
+        return self._first("generate_sql_query", natural_language, schema)
+
+    def explain_results(self, query: str, results: List[Dict], question: str) -> str:
+        return self._first("explain_results", query, results, question)
+
+    def _generate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return self._first("_generate_text", prompt, max_tokens, temperature)
+
+    async def agenerate_sql_query(self, natural_language: str, schema: str) -> str:
+        return await self._afirst("agenerate_sql_query", natural_language, schema)
+
+    async def aexplain_results(self, query: str, results: List[Dict], question: str) -> str:
+        return await self._afirst("aexplain_results", query, results, question)
+
+    async def agenerate_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1) -> str:
+        return await self._afirst("agenerate_text", prompt, max_tokens, temperature)
+
+    async def _first_stream(self, method: str, *args):
+        # Fall back only while nothing has been sent to the client yet
+        errors = []
+        for name, service in self.services.items():
+            started = False
+            try:
+                async for chunk in getattr(service, method)(*args):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                errors.append(e)
+                continue
+            self._used(name)
+            return
+        raise self._all_failed(errors)
+
+    async def astream_text(self, prompt: str, max_tokens: int = 300, temperature: float = 0.1):
+        async for chunk in self._first_stream("astream_text", prompt, max_tokens, temperature):
+            yield chunk
+
+    async def stream_sql(self, natural_language: str, schema: str):
+        async for chunk in self._first_stream("stream_sql", natural_language, schema):
+            yield chunk
+
+    async def stream_explanation(self, query: str, results: List[Dict], question: str):
+        async for chunk in self._first_stream("stream_explanation", query, results, question):
+            yield chunk
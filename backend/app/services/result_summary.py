@@ -0,0 +1,96 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Rough chars-per-token ratio for English text and numbers; good enough for a budget
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value)
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def _format_rows(rows: List[Dict[str, Any]], start: int = 1) -> str:
+    return "\n".join(
+        f"Row {idx}: " + ", ".join(f"{k}: {_format_value(v)}" for k, v in row.items())
+        for idx, row in enumerate(rows, start)
+    )
+
+
+def _column_stats(df: pd.DataFrame, top_k: int) -> List[str]:
+    lines = []
+    for col in df.columns:
+        series = df[col]
+        non_null = int(series.notna().sum())
+        numeric = pd.to_numeric(series, errors="coerce") if series.dtype == object else series
+        if pd.api.types.is_numeric_dtype(numeric) and not pd.api.types.is_bool_dtype(numeric) \
+                and numeric.notna().sum() >= max(1, non_null * 0.9):
+            values = numeric.dropna().to_numpy(dtype=np.float64)
+            if values.size:
+                p25, p50, p75 = np.quantile(values, [0.25, 0.5, 0.75])
+                lines.append(
+                    f"- {col} (numeric, {non_null} non-null): min {_format_value(values.min())}, "
+                    f"p25 {_format_value(p25)}, median {_format_value(p50)}, p75 {_format_value(p75)}, "
+                    f"max {_format_value(values.max())}, mean {_format_value(values.mean())}"
+                )
+                continue
+        counts = series.astype(str).where(series.notna()).value_counts()
+        top = ", ".join(f"{_format_value(value)} ({count})" for value, count in counts.head(top_k).items())
+        lines.append(f"- {col} ({non_null} non-null, {len(counts)} distinct): top values {top}")
+    return lines
+
+
+def condense_results(
+    results: List[Dict[str, Any]],
+    token_budget: int = 1500,
+    sample_rows: int = 10,
+    top_k: int = 5,
+) -> str:
+    """Render query results for an explanation prompt within ``token_budget``.
+
+    Small result sets are passed through row by row. Larger ones are replaced
+    by per-column statistics (counts, top-k values, numeric min/max/mean and
+    quartiles) plus the first few rows, shrinking the sample and top-k lists
+    until the text fits the budget.
+    """
+    if not results:
+        return "No rows returned."
+
+    # Pass small results through verbatim; stop formatting as soon as the budget is exceeded
+    max_chars = token_budget * CHARS_PER_TOKEN
+    lines, used = [], 0
+    for idx, row in enumerate(results, 1):
+        line = _format_rows([row], start=idx)
+        used += len(line) + 1
+        if used > max_chars:
+            break
+        lines.append(line)
+    else:
+        return "\n".join(lines)
+
+    df = pd.DataFrame.from_records(results)
+    while True:
+        header = f"{len(results)} rows, {len(df.columns)} columns. Column summary:"
+        stats = "\n".join(_column_stats(df, top_k))
+        sample = _format_rows(results[:sample_rows]) if sample_rows else ""
+        text = f"{header}\n{stats}"
+        if sample:
+            text += f"\nFirst {min(sample_rows, len(results))} rows:\n{sample}"
+        if estimate_tokens(text) <= token_budget or (sample_rows == 0 and top_k == 1):
+            break
+        if sample_rows > 0:
+            sample_rows //= 2
+        else:
+            top_k = max(1, top_k - 2)
+
+    if len(text) > max_chars:
+        text = text[:max_chars - 20].rsplit("\n", 1)[0] + "\n... (truncated)"
+    return text
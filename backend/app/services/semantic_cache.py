@@ -0,0 +1,222 @@
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.sql_cache import normalize_question, schema_fingerprint
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+# Numbers and snake_case column names must match exactly for a reuse
+_KEY_TERM = re.compile(r"\b(?:\d+(?:\.\d+)?|[a-z0-9]+(?:_[a-z0-9]+)+)\b")
+# Negations flip a question's meaning while barely moving its embedding
+_NEGATION = re.compile(r"\b(?:not|no|without|except|never|none|nor|neither)\b|n't\b")
+
+# Words that carry no meaning for SQL generation
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "by", "with", "and", "or",
+    "is", "are", "was", "were", "be", "do", "does", "have", "has", "had",
+    "which", "what", "who", "whose", "me", "show", "list", "give", "find",
+    "get", "display", "all", "please", "that", "their", "there", "can", "you",
+}
+
+# Paraphrases that should map onto the same token
+_SYNONYMS = {
+    "highest": "top", "largest": "top", "biggest": "top", "most": "top", "max": "top", "maximum": "top",
+    "lowest": "bottom", "smallest": "bottom", "least": "bottom", "min": "bottom", "minimum": "bottom",
+    "average": "avg", "mean": "avg",
+    "number": "count", "many": "count", "total": "count",
+    "student": "students", "applicant": "students", "applicants": "students",
+    "ratings": "rating", "score": "rating", "scores": "rating",
+    "rings": "ring",
+}
+
+
+class HashingEmbedder:
+    """Dependency-free sentence embedding using the hashing trick.
+
+    Word unigrams, word bigrams and character trigrams are hashed into a
+    fixed-size signed vector and L2-normalized, so cosine similarity is a dot
+    product.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _tokens(self, text: str) -> List[str]:
+        words = [_SYNONYMS.get(w, w) for w in _TOKEN.findall(text.lower())]
+        return [w for w in words if w not in _STOPWORDS]
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = self._tokens(text)
+        features = [(f"w:{w}", 1.0) for w in words]
+        features += [(f"b:{a}_{b}", 0.5) for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign * weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-transformers model; only used when configured."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class VectorIndex:
+    """Compact brute-force cosine index over a contiguous float32 matrix.
+
+    Once ``max_entries`` vectors are stored the oldest slot is overwritten.
+    """
+
+    def __init__(self, dim: int, max_entries: int = 5000):
+        self.dim = dim
+        self.max_entries = max_entries
+        self._vectors = np.zeros((min(64, max_entries), dim), dtype=np.float32)
+        self._payloads: List[Any] = []
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, vector: np.ndarray, payload: Any):
+        if len(self._payloads) < self.max_entries:
+            if len(self._payloads) == self._vectors.shape[0]:
+                grown = np.zeros((min(self._vectors.shape[0] * 2, self.max_entries), self.dim), dtype=np.float32)
+                grown[:len(self._payloads)] = self._vectors[:len(self._payloads)]
+                self._vectors = grown
+            slot = len(self._payloads)
+            self._payloads.append(payload)
+        else:
+            slot = self._next
+            self._payloads[slot] = payload
+            self._next = (self._next + 1) % self.max_entries
+        self._vectors[slot] = vector
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[Any], float]:
+        if not self._payloads:
+            return None, 0.0
+        scores = self._vectors[:len(self._payloads)] @ vector
+        best = int(np.argmax(scores))
+        return self._payloads[best], float(scores[best])
+
+
+class SemanticSQLCache:
+    """Reuses generated SQL for paraphrased questions.
+
+    Questions are embedded and matched against earlier questions for the same
+    provider and schema. A stored query is reused only when cosine similarity
+    reaches ``threshold`` and both questions mention exactly the same numbers,
+    column names and negations, so "top 5" never reuses the SQL for "top 10",
+    "fraud_rating" never reuses the SQL for "ssn_rating" and "not flagged"
+    never reuses the SQL for "flagged".
+    """
+
+    def __init__(self, embedder=None, threshold: float = 0.85, max_entries: int = 5000):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected_key_terms = 0
+
+    def _scope(self, provider: str, schema: str) -> str:
+        return f"{provider}:{schema_fingerprint(schema)}"
+
+    def _key_terms(self, question: str) -> Tuple[str, ...]:
+        terms = set(_KEY_TERM.findall(question))
+        terms.update("not" if m.group() == "n't" else m.group() for m in _NEGATION.finditer(question))
+        return tuple(sorted(terms))
+
+    def get(self, question: str, provider: str, schema: str) -> Optional[str]:
+        question = normalize_question(question)
+        vector = self.embedder.embed(question)
+        with self._lock:
+            index = self._indexes.get(self._scope(provider, schema))
+            payload, score = index.nearest(vector) if index is not None else (None, 0.0)
+            if payload is None or score < self.threshold:
+                self.misses += 1
+                return None
+            stored_question, sql_query = payload
+            if self._key_terms(stored_question) != self._key_terms(question):
+                self.rejected_key_terms += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+        print(f"⚡ Semantic SQL cache hit ({score:.3f}) for '{question}' via '{stored_question}'")
+        return sql_query
+
+    def set(self, question: str, provider: str, schema: str, sql_query: str):
+        question = normalize_question(question)
+        vector = self.embedder.embed(question)
+        scope = self._scope(provider, schema)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = VectorIndex(vector.shape[0], self.max_entries)
+            elif index.nearest(vector)[0] == (question, sql_query):
+                return
+            index.add(vector, (question, sql_query))
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "embedder": type(self.embedder).__name__,
+                "threshold": self.threshold,
+                "scopes": len(self._indexes),
+                "entries": sum(len(index) for index in self._indexes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "rejected_key_terms": self.rejected_key_terms,
+            }
+
+
+_semantic_cache: Optional[SemanticSQLCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticSQLCache:
+    """Process-wide semantic cache configured from settings."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                embedder = None
+                if settings.semantic_cache_model:
+                    try:
+                        embedder = SentenceTransformerEmbedder(settings.semantic_cache_model)
+                    except Exception as e:
+                        print(f"⚠️ Falling back to hashing embedder: {str(e)}")
+                _semantic_cache = SemanticSQLCache(
+                    embedder=embedder,
+                    threshold=settings.semantic_cache_threshold,
+                    max_entries=settings.semantic_cache_max_entries
+                )
+    return _semantic_cache
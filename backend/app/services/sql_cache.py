@@ -0,0 +1,49 @@
+import hashlib
+import re
+import threading
+from typing import Optional
+
+from app.cache import LRUCache, SQLiteCache, TieredCache
+from app.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!;]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold and collapse whitespace so trivially different phrasings share a key."""
+    question = _WHITESPACE.sub(" ", question.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", question)
+
+
+def schema_fingerprint(schema: str) -> str:
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+
+
+def sql_cache_key(question: str, provider: str, schema: str) -> str:
+    raw = f"{provider}\x1f{schema_fingerprint(schema)}\x1f{normalize_question(question)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+_sql_cache: Optional[TieredCache] = None
+_sql_cache_lock = threading.Lock()
+
+
+def get_sql_cache() -> TieredCache:
+    """Process-wide NL-to-SQL cache configured from settings."""
+    global _sql_cache
+    if _sql_cache is None:
+        with _sql_cache_lock:
+            if _sql_cache is None:
+                disk = None
+                if settings.sql_cache_path:
+                    disk = SQLiteCache(
+                        settings.sql_cache_path,
+                        max_entries=settings.sql_cache_disk_max_entries,
+                        ttl=settings.sql_cache_ttl
+                    )
+                _sql_cache = TieredCache(
+                    LRUCache(max_entries=settings.sql_cache_max_entries, ttl=settings.sql_cache_ttl),
+                    disk
+                )
+    return _sql_cache
@@ -0,0 +1,245 @@
+import functools
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+NUMERIC_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint", "decimal", "numeric", "float", "double", "real", "bit"}
+TEXT_TYPES = {"char", "varchar", "tinytext", "text", "mediumtext", "longtext", "enum", "set"}
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "fifteen": 15, "twenty": 20, "twenty five": 25, "thirty": 30, "fifty": 50, "hundred": 100,
+}
+_NUMBER = r"(?P<n>\d{1,4}|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+_LEADING_FILLER = {"the", "a", "an", "their", "its", "student", "students", "s"}
+_TRAILING_FILLER = {"value", "values", "column", "field"}
+_VALUE = re.compile(r"^[a-z0-9_\-]+(?: [a-z0-9_\-]+){0,2}$")
+# "low or medium", "not high": more than one literal, left to the LLM
+_CONNECTIVES = {"and", "or", "not", "but", "nor"}
+# Statement separators, backticks and escapes never belong in a templated question
+_UNSAFE = re.compile(r"[;`\\]|--|/\*")
+_DECIMAL = re.compile(r"^\d{1,12}(?:\.\d{1,6})?$")
+
+_LEAD = r"^(?:(?:please|can you|could you|show me|show|list|give me|get|find|display|tell me|what is|what are|whats|who are|which are)\s+)*(?:the\s+)?"
+
+_TOP_PATTERNS = [
+    # "top 10 students by fraud_rating", "bottom 5 by ssn rating"
+    re.compile(_LEAD + r"(?P<dir>top|highest|bottom|lowest)\s+(?:" + _NUMBER + r"\s+)?(?:students?\s+)?"
+               r"(?:by|on|for|ranked by|sorted by|ordered by|with the (?:highest|lowest))\s+(?P<col>.+)$"),
+    # "10 students with the highest fraud rating", "students with the lowest email_rating"
+    re.compile(_LEAD + r"(?:" + _NUMBER + r"\s+)?students?\s+(?:with|having|that have)\s+(?:the\s+)?"
+               r"(?P<dir>highest|lowest|top|bottom)\s+(?P<col>.+)$"),
+]
+_COUNT_ALL = re.compile(_LEAD + r"(?:how many|count(?: of)?|number of|total number of)\s+(?:the\s+)?students?"
+                        r"(?:\s+(?:are there|in total|total|do we have|are in the table))?$")
+_COUNT_GROUP = re.compile(_LEAD + r"(?:how many|count(?: of)?|number of)\s+(?:the\s+)?students?\s+"
+                          r"(?:are there\s+)?(?:per|by|in each|for each|grouped by|broken down by)\s+(?P<group>.+)$")
+_COUNT_WHERE = re.compile(_LEAD + r"(?:how many|count(?: of)?|number of|total number of)\s+(?:the\s+)?students?\s+"
+                          r"(?:where|with|have|has|that have|having|whose|who have)\s+(?P<cond>.+?)(?:\s+are there)?$")
+_AVERAGE = re.compile(_LEAD + r"(?:average|avg|mean)\s+(?:of\s+)?(?P<col>.+?)"
+                      r"(?:\s+(?:grouped by|group by|by|per|for each|in each|across|broken down by)\s+(?P<group>.+))?$")
+
+_OPERATOR = re.compile(
+    r"\s*(?:>=|<=|<>|!=|>|<|=)\s*|\s+(?:is not|is|equals|equal to|of|above|over|greater than|more than|"
+    r"at least|below|under|less than|at most)\s+"
+)
+_OPERATORS = {
+    ">": ">", "above": ">", "over": ">", "greater than": ">", "more than": ">",
+    ">=": ">=", "at least": ">=",
+    "<": "<", "below": "<", "under": "<", "less than": "<",
+    "<=": "<=", "at most": "<=",
+    "=": "=", "is": "=", "equals": "=", "equal to": "=", "of": "=",
+    "<>": "<>", "!=": "<>", "is not": "<>",
+}
+
+
+@functools.lru_cache(maxsize=32)
+def parse_schema(schema: str) -> Tuple[str, Dict[str, str]]:
+    """(table, {column: data_type}) from the prompt schema rendered by SchemaCache."""
+    table_match = re.search(r"^Table:\s*(\w+)", schema, re.MULTILINE)
+    columns = {
+        name: data_type.lower()
+        for name, data_type in re.findall(r"^- (\w+): (\w+)", schema, re.MULTILINE)
+    }
+    return (table_match.group(1) if table_match else "students"), columns
+
+
+def _normalize(question: str) -> str:
+    text = question.lower().replace("%", " ")
+    text = re.sub(r"[^a-z0-9_<>=!.\-\s]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _quote(identifier: str) -> str:
+    return f"`{identifier}`"
+
+
+class TemplateMatcher:
+    """Rule-based NL-to-SQL for the most common question shapes.
+
+    Recognizes "top/bottom N students by <column>", "how many students
+    [where <column> <op> <value>]", "how many students per <column>" and
+    "average <column> [by <column>]". Column names are resolved only against
+    the live schema, so every identifier is whitelisted; numbers and short
+    alphanumeric values are the only literals accepted. Anything else returns
+    None and goes to the LLM.
+    """
+
+    def __init__(self, default_limit: int = 10, max_limit: int = 1000):
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+
+    def _column(self, phrase: str, columns: Dict[str, str], types=None) -> Optional[str]:
+        words = phrase.replace("_", " ").split()
+        while words and words[0] in _LEADING_FILLER:
+            words = words[1:]
+        candidates = ["_".join(words)]
+        while words and words[-1] in _TRAILING_FILLER:
+            words = words[:-1]
+            candidates.append("_".join(words))
+        lowered = {name.lower(): name for name in columns}
+        column = next((lowered[c] for c in candidates if c in lowered), None)
+        if column is None or (types is not None and columns[column] not in types):
+            return None
+        return column
+
+    def _limit(self, n: Optional[str]) -> Optional[int]:
+        if n is None:
+            return self.default_limit
+        value = _NUMBER_WORDS[n] if n in _NUMBER_WORDS else int(n)
+        return value if 0 < value <= self.max_limit else None
+
+    def _top(self, q: str, table: str, columns: Dict[str, str]) -> Optional[str]:
+        for pattern in _TOP_PATTERNS:
+            m = pattern.match(q)
+            if not m:
+                continue
+            column = self._column(m.group("col"), columns, NUMERIC_TYPES)
+            limit = self._limit(m.group("n"))
+            if column is None or limit is None:
+                return None
+            order = "DESC" if m.group("dir") in ("top", "highest") else "ASC"
+            select = ", ".join(_quote(c) for c in ("id", column) if c in columns) if column != "id" else _quote(column)
+            return (
+                f"SELECT {select} FROM {_quote(table)} WHERE {_quote(column)} IS NOT NULL "
+                f"ORDER BY {_quote(column)} {order} LIMIT {limit};"
+            )
+        return None
+
+    def _comparison(self, column: str, op: str, value: str, columns: Dict[str, str]) -> Optional[str]:
+        operator = _OPERATORS[op]
+        data_type = columns[column]
+        if data_type in NUMERIC_TYPES:
+            return f"{_quote(column)} {operator} {value}" if _DECIMAL.match(value) else None
+        if (data_type in TEXT_TYPES and operator in ("=", "<>") and _VALUE.match(value)
+                and not _CONNECTIVES.intersection(value.split())):
+            return f"{_quote(column)} {operator} '{value}'"
+        return None
+
+    def _condition(self, cond: str, columns: Dict[str, str]) -> Optional[str]:
+        # Try every operator position; the column must resolve on the left
+        for m in _OPERATOR.finditer(cond):
+            column = self._column(cond[:m.start()], columns)
+            value = cond[m.end():].strip()
+            if column is not None and value:
+                return self._comparison(column, m.group().strip(), value, columns)
+        # "students with fraud_ring_flag": a set numeric flag/counter
+        column = self._column(cond, columns, NUMERIC_TYPES)
+        return f"{_quote(column)} > 0" if column is not None else None
+
+    def _count(self, q: str, table: str, columns: Dict[str, str]) -> Optional[str]:
+        if _COUNT_ALL.match(q):
+            return f"SELECT COUNT(*) AS total FROM {_quote(table)};"
+        m = _COUNT_GROUP.match(q)
+        if m:
+            group = self._column(m.group("group"), columns)
+            if group is None:
+                return None
+            return (
+                f"SELECT {_quote(group)}, COUNT(*) AS students FROM {_quote(table)} "
+                f"GROUP BY {_quote(group)} ORDER BY students DESC;"
+            )
+        m = _COUNT_WHERE.match(q)
+        if m:
+            condition = self._condition(m.group("cond"), columns)
+            if condition is None:
+                return None
+            return f"SELECT COUNT(*) AS total FROM {_quote(table)} WHERE {condition};"
+        return None
+
+    def _average(self, q: str, table: str, columns: Dict[str, str]) -> Optional[str]:
+        m = _AVERAGE.match(q)
+        if not m:
+            return None
+        column = self._column(m.group("col"), columns, NUMERIC_TYPES)
+        if column is None:
+            return None
+        alias = f"avg_{column}"
+        if m.group("group") is None:
+            return f"SELECT AVG({_quote(column)}) AS {alias} FROM {_quote(table)};"
+        group = self._column(m.group("group"), columns)
+        if group is None:
+            return None
+        return (
+            f"SELECT {_quote(group)}, AVG({_quote(column)}) AS {alias}, COUNT(*) AS students "
+            f"FROM {_quote(table)} GROUP BY {_quote(group)} ORDER BY {alias} DESC;"
+        )
+
+    def _lookup(self, question: str, schema: str) -> Tuple[Optional[str], Optional[str]]:
+        table, columns = parse_schema(schema)
+        if not columns or _UNSAFE.search(question):
+            return None, None
+        q = _normalize(question)
+        for name, rule in (("top", self._top), ("count", self._count), ("average", self._average)):
+            sql_query = rule(q, table, columns)
+            if sql_query:
+                return name, sql_query
+        return None, None
+
+    def matches(self, question: str, schema: str) -> bool:
+        """Whether a template answers the question; leaves the stats untouched."""
+        return self._lookup(question, schema)[1] is not None
+
+    def match(self, question: str, schema: str) -> Optional[str]:
+        """SQL for a recognized question, or None when the LLM should handle it."""
+        name, sql_query = self._lookup(question, schema)
+        with self._lock:
+            if sql_query is None:
+                self.misses += 1
+                return None
+            self.hits[name] = self.hits.get(name, 0) + 1
+        print(f"⚡ Template SQL ({name}) for '{question}'")
+        return sql_query
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_hits = sum(self.hits.values())
+            lookups = total_hits + self.misses
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "hit_rate": round(total_hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_template_matcher: Optional[TemplateMatcher] = None
+_template_matcher_lock = threading.Lock()
+
+
+def get_template_matcher() -> TemplateMatcher:
+    """Process-wide matcher configured from settings."""
+    global _template_matcher
+    if _template_matcher is None:
+        with _template_matcher_lock:
+            if _template_matcher is None:
+                _template_matcher = TemplateMatcher(
+                    default_limit=settings.template_sql_default_limit,
+                    max_limit=settings.template_sql_max_limit
+                )
+    return _template_matcher
@@ -0,0 +1,213 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import sqlparse
+from sqlparse import tokens as T
+from sqlparse.sql import Comment, Function, Identifier, IdentifierList, Parenthesis
+
+
+class SQLValidationError(ValueError):
+    pass
+
+
+class QueryTooExpensiveError(SQLValidationError):
+    pass
+
+
+# Keywords that must never appear in an LLM-generated read-only query
+# (INSERT()/REPLACE() are also string functions, so only the statement forms are rejected)
+_FORBIDDEN = re.compile(
+    r"\b(INSERT(?!\s*\()|UPDATE|DELETE|REPLACE(?!\s*\()|MERGE|DROP|ALTER|CREATE|TRUNCATE|RENAME|GRANT|REVOKE|"
+    r"LOCK|UNLOCK|CALL|DO|HANDLER|LOAD|LOAD_FILE|SET|OUTFILE|DUMPFILE|SLEEP|BENCHMARK)\b",
+    re.IGNORECASE,
+)
+class CheckedSQL(str):
+    """A statement returned by check_query; checking it again would only repeat the EXPLAIN."""
+
+
+# Generated queries may only read these tables (plus their own CTEs)
+ALLOWED_TABLES = ("students",)
+
+
+def _strip_literals(statement) -> str:
+    """Statement text with string literals and comments removed."""
+    parts = []
+    for token in statement.flatten():
+        if token.ttype in T.Literal.String or token.ttype in T.Comment:
+            continue
+        parts.append(token.value)
+    return "".join(parts)
+
+
+def _is_subquery(parenthesis) -> bool:
+    return any(t.ttype is T.DML or t.ttype is T.Keyword.CTE for t in parenthesis.tokens)
+
+
+def _walk_from(tokens, refs: list, tables: bool = True):
+    expect = False
+    for token in tokens:
+        if token.is_whitespace or token.ttype in T.Comment or isinstance(token, Comment):
+            continue
+        if expect:
+            items = token.get_identifiers() if isinstance(token, IdentifierList) else [token]
+            for item in items:
+                subqueries = [t for t in getattr(item, "tokens", []) if isinstance(t, Parenthesis)]
+                if isinstance(item, Parenthesis):
+                    _walk_from(item.tokens, refs)
+                elif subqueries:
+                    for subquery in subqueries:
+                        _walk_from(subquery.tokens, refs)
+                elif isinstance(item, Identifier):
+                    refs.append((item.get_parent_name(), item.get_real_name()))
+                else:
+                    refs.append((None, str(item).strip("`")))
+            expect = False
+            continue
+        if tables and token.ttype in T.Keyword and (token.normalized == "FROM" or token.normalized.endswith("JOIN")):
+            expect = True
+        elif isinstance(token, Function):
+            # EXTRACT(YEAR FROM d), TRIM(x FROM y): FROM inside a call names no table
+            _walk_from(token.tokens, refs, tables=False)
+        elif isinstance(token, Parenthesis):
+            _walk_from(token.tokens, refs, tables=tables or _is_subquery(token))
+        elif token.is_group:
+            _walk_from(token.tokens, refs, tables)
+
+
+def table_references(sql: str) -> List[Tuple[Optional[str], str]]:
+    """(schema, table) for every item after FROM/JOIN, comma lists and subqueries included."""
+    refs: list = []
+    for statement in sqlparse.parse(sql or ""):
+        _walk_from(statement.tokens, refs)
+    return refs
+
+
+def _cte_names(statement) -> set:
+    names, expect = set(), False
+    for token in statement.tokens:
+        if token.is_whitespace:
+            continue
+        if expect:
+            items = token.get_identifiers() if isinstance(token, IdentifierList) else [token]
+            names.update(str(item.tokens[0]).strip("`").lower() for item in items if isinstance(item, Identifier))
+            expect = False
+        elif token.ttype is T.Keyword.CTE:
+            expect = True
+    return names
+
+
+def validate_select(sql: str, allowed_tables: Iterable[str] = ALLOWED_TABLES) -> str:
+    """Ensure `sql` parses as exactly one read-only SELECT (CTEs allowed).
+
+    Only ``allowed_tables`` and the query's own CTEs may be read; schema-
+    qualified names (mysql.user, information_schema.*) are rejected.
+    Returns the statement without the trailing semicolon.
+    """
+    statements = [s for s in sqlparse.parse(sql or "") if s.value.strip(" \n\t;")]
+    if not statements:
+        raise SQLValidationError("Generated query is empty")
+    if len(statements) > 1:
+        raise SQLValidationError("Query contains multiple SQL statements")
+
+    statement = statements[0]
+    if statement.get_type() != "SELECT":
+        raise SQLValidationError("Generated query must be a SELECT statement")
+
+    match = _FORBIDDEN.search(_strip_literals(statement))
+    if match:
+        raise SQLValidationError(f"Forbidden keyword in generated query: {match.group(1).upper()}")
+
+    readable = {t.lower() for t in allowed_tables} | _cte_names(statement)
+    for schema, table in table_references(str(statement)):
+        if schema or table.lower() not in readable:
+            name = f"{schema}.{table}" if schema else table
+            raise SQLValidationError(f"Generated query may not read from {name}")
+
+    return str(statement).strip().rstrip(";").strip()
+
+
+def _top_level(sql: str):
+    """(offset, token) pairs for the statement's top-level tokens; subqueries stay grouped."""
+    offset = 0
+    for token in sqlparse.parse(sql)[0].tokens:
+        yield offset, token
+        offset += len(str(token))
+
+
+def enforce_limit(sql: str, max_rows: int) -> str:
+    """Append ``LIMIT max_rows`` to the outer query, or lower an existing larger LIMIT.
+
+    Comments are dropped first (optimizer hints are kept), so a trailing
+    ``--``/``#`` comment can't swallow the appended LIMIT.
+    """
+    sql = sqlparse.format(sql, strip_comments=True).strip()
+    for offset, token in _top_level(sql):
+        if token.ttype is T.Keyword and token.normalized == "LIMIT":
+            tail = sql[offset + len(str(token)):]
+            m = re.match(r"\s+(\d+)(?:\s*,\s*(\d+))?", tail)
+            if not m:
+                raise SQLValidationError("LIMIT must be a literal row count")
+            count_group = 2 if m.group(2) else 1
+            if int(m.group(count_group)) <= max_rows:
+                return sql
+            start = offset + len(str(token)) + m.start(count_group)
+            return sql[:start] + str(max_rows) + sql[offset + len(str(token)) + m.end(count_group):]
+    return f"{sql} LIMIT {max_rows}"
+
+
+def add_max_execution_time(sql: str, max_execution_ms: int) -> str:
+    """Add a MAX_EXECUTION_TIME optimizer hint to the outer SELECT (after any CTEs)."""
+    if not max_execution_ms or "MAX_EXECUTION_TIME" in sql.upper():
+        return sql
+    for offset, token in _top_level(sql):
+        if token.ttype is T.DML and token.normalized == "SELECT":
+            end = offset + len(str(token))
+            return f"{sql[:end]} /*+ MAX_EXECUTION_TIME({int(max_execution_ms)}) */{sql[end:]}"
+    return sql
+
+
+def _examined_rows(node: Any, scans: float = 1.0) -> float:
+    if isinstance(node, list):
+        return sum(_examined_rows(item, scans) for item in node)
+    if not isinstance(node, dict):
+        return 0.0
+    total = 0.0
+    for key, value in node.items():
+        if key == "nested_loop" and isinstance(value, list):
+            # Table i is scanned once per row produced by the join of tables 0..i-1
+            produced = scans
+            for item in value:
+                total += _examined_rows(item, produced)
+                table = item.get("table", {}) if isinstance(item, dict) else {}
+                produced = float(table.get("rows_produced_per_join") or produced)
+        elif key == "table" and isinstance(value, dict):
+            per_scan = value.get("rows_examined_per_scan", value.get("rows"))
+            total += float(per_scan or 0) * scans
+            total += _examined_rows(value, 1.0)
+        elif isinstance(value, (dict, list)):
+            total += _examined_rows(value, scans)
+    return total
+
+
+def plan_estimate(plan: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Estimated rows examined and optimizer cost from EXPLAIN FORMAT=JSON output."""
+    query_block = plan.get("query_block", {})
+    cost = (query_block.get("cost_info") or {}).get("query_cost")
+    return {
+        "rows_examined": _examined_rows(query_block),
+        "query_cost": float(cost) if cost is not None else None,
+    }
+
+
+def check_plan(plan: Dict[str, Any], max_examined_rows: Optional[float], max_cost: Optional[float] = None) -> Dict[str, Optional[float]]:
+    estimate = plan_estimate(plan)
+    if max_examined_rows and estimate["rows_examined"] > max_examined_rows:
+        raise QueryTooExpensiveError(
+            f"Query would examine about {int(estimate['rows_examined']):,} rows "
+            f"(limit {int(max_examined_rows):,}); try a narrower question"
+        )
+    if max_cost and estimate["query_cost"] is not None and estimate["query_cost"] > max_cost:
+        raise QueryTooExpensiveError(
+            f"Query cost estimate {estimate['query_cost']:,.0f} exceeds the limit of {max_cost:,.0f}"
+        )
+    return estimate
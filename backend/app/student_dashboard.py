@@ -1,19 +1,20 @@
 import dash
 from dash import dcc, html, Input, Output, callback, dash_table, State
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
-import mysql.connector
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from datetime import date, datetime, timedelta
+import hashlib
+import json
+import math
 
-# Database connection configuration
-db_config = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'student'
-}
+from app.cache import LRUCache
+from app.config import settings
+from app.dashboard_snapshot import get_dashboard_snapshot
+from app.downsampling import box_statistics, histogram_bins, lttb, minmax_decimate, stratified_sample
+from app.database import get_shared_db_manager
 
 # Initialize Dash app with Bootstrap theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -147,9 +148,13 @@ app.layout = dbc.Container([
             dbc.Card([
                 dbc.CardHeader("Raw Data", className="bg-primary text-white"),
                 dbc.CardBody([
+                    # Paging, sorting and filtering run on the server; the
+                    # browser only ever holds the current page
                     dash_table.DataTable(
                         id='data-table',
+                        page_current=0,
                         page_size=10,
+                        page_action='custom',
                         style_table={'overflowX': 'auto'},
                         style_cell={
                             'textAlign': 'left',
@@ -161,16 +166,19 @@ app.layout = dbc.Container([
                             'backgroundColor': '#f8f9fa',
                             'fontWeight': 'bold'
                         },
-                        filter_action="native",
-                        sort_action="native"
+                        filter_action='custom',
+                        filter_query='',
+                        sort_action='custom',
+                        sort_mode='multi',
+                        sort_by=[]
                     )
                 ])
             ], className="shadow-sm")
         ], width=12)
     ]),
     
-    # Hidden div for storing data
-    html.Div(id='stored-data', style={'display': 'none'}),
+    # Key of the current result in the server-side result cache
+    dcc.Store(id='stored-data'),
     
     # Refresh interval
     dcc.Interval(
@@ -180,48 +188,146 @@ app.layout = dbc.Container([
     )
 ], fluid=True)
 
-# Fetch column names from database
-def get_table_columns():
+# SQL aggregate for each dashboard aggregation; std matches pandas' sample std
+AGGREGATIONS = {
+    'count': 'COUNT',
+    'avg': 'AVG',
+    'sum': 'SUM',
+    'max': 'MAX',
+    'min': 'MIN',
+    'std': 'STDDEV_SAMP'
+}
+NUMERIC_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'bigint', 'decimal', 'numeric', 'float', 'double', 'real')
+
+def quote(column):
+    return f"`{column}`"
+
+# Queries go through the API's pooled DatabaseManager, so callbacks reuse warm
+# connections. Analytic reads are never capped: a chart over a silently cut
+# frame would be wrong. Small aggregate results go through the result cache so
+# repeated filters skip MySQL; raw row frames stay out of it (cache=False).
+def run_query(query, params=None, cache=True):
+    db_manager = get_shared_db_manager()
+    execute = db_manager.execute_cached if cache else db_manager.execute_query
+    rows = execute(query, tuple(params) if params else None, limited=False)
+    return pd.DataFrame(rows)
+
+# Column names and types from the shared schema cache; INFORMATION_SCHEMA is
+# only re-read when the students table's CREATE_TIME/UPDATE_TIME changes
+def get_column_types():
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-        cursor.execute("SHOW COLUMNS FROM students")
-        columns = [column[0] for column in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return columns
+        columns = get_shared_db_manager().schema_cache.get_columns()
+        return {name: str(data_type).lower() for name, data_type, _ in columns}
     except Exception as e:
         print(f"Error fetching columns: {e}")
-        return []
+        return {}
+
+def get_table_columns():
+    return list(get_column_types())
+
+def is_numeric_type(column_type):
+    return column_type.split('(')[0].split()[0] in NUMERIC_TYPES
+
+def build_filters(date_col=None, start_date=None, end_date=None):
+    conditions = []
+    params = []
+    # Add date filtering if specified
+    if date_col and start_date and end_date:
+        conditions.append(f"{quote(date_col)} BETWEEN %s AND %s")
+        params.extend([start_date, end_date])
+    return conditions, params
+
+def where_clause(conditions):
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+# With DASHBOARD_SNAPSHOT_ENABLED, filters, group-bys and statistics run
+# vectorized over an in-memory columnar copy of students; SQL is the fallback
+def from_snapshot(method, *args):
+    if not settings.dashboard_snapshot_enabled:
+        return None
+    try:
+        return getattr(get_dashboard_snapshot(), method)(*args)
+    except Exception as e:
+        print(f"⚠️ Dashboard snapshot unavailable, querying MySQL: {e}")
+        return None
 
 # Fetch data from database with date filtering
 def fetch_student_data(selected_columns, date_col=None, start_date=None, end_date=None):
     if not selected_columns:
         return pd.DataFrame()
     
-    try:
-        conn = mysql.connector.connect(**db_config)
-        
-        base_query = f"SELECT {', '.join(selected_columns)} FROM students"
-        conditions = []
-        params = []
-        
-        # Add date filtering if specified
-        if date_col and start_date and end_date:
-            conditions.append(f"{date_col} BETWEEN %s AND %s")
-            params.extend([start_date, end_date])
-        
-        query = base_query
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        df = pd.read_sql(query, conn, params=params if params else None)
-        conn.close()
+    df = from_snapshot('select', selected_columns, date_col, start_date, end_date)
+    if df is not None:
         return df
+    try:
+        conditions, params = build_filters(date_col, start_date, end_date)
+        query = f"SELECT {', '.join(quote(col) for col in selected_columns)} FROM students{where_clause(conditions)}"
+        return run_query(query, params, cache=False)
     except Exception as e:
         print(f"Error fetching data: {e}")
         return pd.DataFrame()
 
+# Let MySQL do the GROUP BY so only one row per group comes back
+def fetch_aggregated_data(group_by, agg_column, aggregation, date_col=None, start_date=None, end_date=None):
+    df = from_snapshot('aggregate', group_by, agg_column, aggregation, date_col, start_date, end_date)
+    if df is not None:
+        return df
+    try:
+        conditions, params = build_filters(date_col, start_date, end_date)
+        # pandas' groupby drops the NULL group; so does this query
+        conditions.append(f"{quote(group_by)} IS NOT NULL")
+        query = (
+            f"SELECT {quote(group_by)}, {AGGREGATIONS[aggregation]}({quote(agg_column)}) AS {quote(agg_column)} "
+            f"FROM students{where_clause(conditions)} "
+            f"GROUP BY {quote(group_by)} ORDER BY {quote(group_by)}"
+        )
+        return run_query(query, params)
+    except Exception as e:
+        print(f"Error fetching aggregated data: {e}")
+        return pd.DataFrame()
+
+# Summary statistics computed by MySQL (or the snapshot), for when the raw rows are never fetched
+def fetch_statistics(numeric_columns, date_col=None, start_date=None, end_date=None):
+    if not numeric_columns:
+        return []
+    stats = from_snapshot('statistics', numeric_columns, date_col, start_date, end_date)
+    if stats is not None:
+        return stats
+    try:
+        conditions, params = build_filters(date_col, start_date, end_date)
+        where = where_clause(conditions)
+        selects = ", ".join(
+            f"AVG({quote(col)}), MIN({quote(col)}), MAX({quote(col)}), STDDEV_SAMP({quote(col)})"
+            for col in numeric_columns
+        )
+        values = run_query(f"SELECT {selects} FROM students{where}", params).iloc[0].tolist()
+        stats = []
+        for i, col in enumerate(numeric_columns):
+            mean, minimum, maximum, std = values[i * 4:i * 4 + 4]
+            if pd.isna(mean):
+                continue
+            # MySQL has no MEDIAN(); average the middle one or two values
+            not_null = conditions + [f"{quote(col)} IS NOT NULL"]
+            median = run_query(
+                f"SELECT AVG(v) AS median FROM ("
+                f"SELECT {quote(col)} AS v, ROW_NUMBER() OVER (ORDER BY {quote(col)}) AS rn, COUNT(*) OVER () AS n "
+                f"FROM students{where_clause(not_null)}) ranked "
+                f"WHERE rn IN (FLOOR((n + 1) / 2), CEIL((n + 1) / 2))",
+                params
+            )['median'].iloc[0]
+            stats.append({
+                'column': col,
+                'mean': float(mean),
+                'median': float(median),
+                'min': float(minimum),
+                'max': float(maximum),
+                'std': float(std) if not pd.isna(std) else float('nan')
+            })
+        return stats
+    except Exception as e:
+        print(f"Error fetching statistics: {e}")
+        return []
+
 # Callback to update column dropdowns and detect date columns
 @app.callback(
     [Output('column-selector', 'options'),
@@ -240,12 +346,81 @@ def update_columns(n):
     
     return options, options, 'YYYY-MM-DD', date_style
 
+# Result frames for the data table, kept server-side and keyed by a hash of
+# the query that produced them; the browser only stores the key
+result_frames = LRUCache(
+    max_entries=256,
+    ttl=settings.dashboard_result_cache_ttl,
+    max_bytes=settings.dashboard_result_cache_max_bytes,
+    sizeof=lambda df: int(df.memory_usage(deep=True).sum())
+)
+
+def result_key(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def fetch_result(spec):
+    if spec['aggregation']:
+        return fetch_aggregated_data(spec['group_by'], spec['agg_column'], spec['aggregation'],
+                                     spec['date_col'], spec['start_date'], spec['end_date'])
+    return fetch_student_data(spec['columns'], spec['date_col'], spec['start_date'], spec['end_date'])
+
+def load_result(stored):
+    df = result_frames.get(stored['key'])
+    if df is None:
+        # Evicted or served by another worker: re-run the query (result cache / snapshot)
+        df = fetch_result(stored['spec'])
+        result_frames.set(stored['key'], df)
+    return df
+
+# Dash DataTable filter expressions, e.g. "{gpa} >= 3 && {major} contains bio"
+FILTER_OPERATORS = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+                    ['contains '], ['datestartswith ']]
+
+def split_filter_part(filter_part):
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value_part = value_part.strip()
+                quote_char = value_part[:1]
+                if value_part and quote_char == value_part[-1] and quote_char in ("'", '"', '`') and len(value_part) > 1:
+                    value = value_part[1:-1].replace('\\' + quote_char, quote_char)
+                else:
+                    # Kept as typed; apply_table_filter converts it for numeric columns only
+                    value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+def apply_table_filter(df, filter_query):
+    for filter_part in (filter_query or '').split(' && '):
+        column, operator, value = split_filter_part(filter_part)
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            if pd.api.types.is_datetime64_any_dtype(values):
+                value = pd.to_datetime(value, errors='coerce')
+            elif pd.api.types.is_numeric_dtype(values):
+                value = pd.to_numeric(value, errors='coerce')
+            elif pd.api.types.infer_dtype(values, skipna=True) in ('decimal', 'integer', 'floating', 'mixed-integer-float'):
+                # DECIMAL columns arrive from MySQL as Decimal objects
+                values, value = pd.to_numeric(values, errors='coerce'), pd.to_numeric(value, errors='coerce')
+            else:
+                values, value = values.astype(str), str(value)
+            df = df.loc[getattr(values, operator)(value)]
+        elif operator == 'contains':
+            df = df.loc[values.astype(str).str.contains(str(value), case=False, regex=False, na=False)]
+        elif operator == 'datestartswith':
+            df = df.loc[values.astype(str).str.startswith(str(value), na=False)]
+    return df
+
 # Main callback for processing data and updating visualizations
 @app.callback(
     [Output('student-visualization', 'figure'),
-     Output('data-table', 'data'),
      Output('data-table', 'columns'),
-     Output('stored-data', 'children'),
+     Output('data-table', 'page_current'),
+     Output('stored-data', 'data'),
      Output('graph-statistics', 'children')],
     [Input('apply-filters', 'n_clicks')],
     [State('column-selector', 'value'),
@@ -259,58 +434,122 @@ def update_dashboard(n_clicks, selected_columns, chart_type, aggregation, group_
     if not selected_columns:
         raise PreventUpdate
     
+    # Only columns that exist in the table ever reach a query
+    column_types = get_column_types()
+    selected_columns = [col for col in selected_columns if col in column_types]
+    if group_by not in column_types:
+        group_by = None
+    if aggregation not in AGGREGATIONS:
+        aggregation = None
+    if not selected_columns:
+        raise PreventUpdate
+    
     # Find the first date column if exists
     date_col = None
     if selected_columns:
         date_cols = [col for col in selected_columns if 'date' in col.lower() or 'time' in col.lower()]
         date_col = date_cols[0] if date_cols else None
     
-    df = fetch_student_data(selected_columns, date_col, start_date, end_date)
+    agg_columns = [col for col in selected_columns if col != group_by]
+    aggregated = bool(aggregation and group_by and len(selected_columns) >= 2 and agg_columns)
+    spec = {
+        'columns': selected_columns,
+        'group_by': group_by if aggregated else None,
+        'agg_column': agg_columns[0] if aggregated else None,
+        'aggregation': aggregation if aggregated else None,
+        'date_col': date_col,
+        'start_date': start_date,
+        'end_date': end_date
+    }
+    df = fetch_result(spec)
     
     if df.empty:
         return (px.scatter(title="No data available"), 
                 [], 
-                [], 
-                df.to_json(date_format='iso', orient='split'),
+                0, 
+                None,
                 html.P("No data to display", className="text-muted"))
     
-    # Store the data for download
-    stored_data = df.to_json(date_format='iso', orient='split')
+    # The table pages through this frame server-side; only its key goes to the browser
+    stored_data = {'key': result_key(spec), 'spec': spec}
+    result_frames.set(stored_data['key'], df)
     
     # Create visualization based on chart type
-    fig = create_visualization(df, selected_columns, chart_type, aggregation, group_by)
+    fig = create_visualization(df, selected_columns, chart_type, aggregation if aggregated else None, group_by)
     
     # Generate statistics summary
-    stats_card = generate_statistics(df, selected_columns)
+    if aggregated:
+        numeric_columns = [col for col in selected_columns if is_numeric_type(column_types[col])]
+        stats_card = render_statistics(fetch_statistics(numeric_columns, date_col, start_date, end_date))
+    else:
+        stats_card = generate_statistics(df, selected_columns)
     
     # Prepare data table
-    table_data = df.to_dict('records')
     table_columns = [{'name': col, 'id': col} for col in df.columns]
     
-    return fig, table_data, table_columns, stored_data, stats_card
+    return fig, table_columns, 0, stored_data, stats_card
+
+# Serve one page of the current result, filtered and sorted on the server
+@app.callback(
+    [Output('data-table', 'data'),
+     Output('data-table', 'page_count')],
+    [Input('data-table', 'page_current'),
+     Input('data-table', 'page_size'),
+     Input('data-table', 'sort_by'),
+     Input('data-table', 'filter_query'),
+     Input('stored-data', 'data')]
+)
+def update_table_page(page_current, page_size, sort_by, filter_query, stored_data):
+    if not stored_data:
+        return [], 1
+    
+    df = apply_table_filter(load_result(stored_data), filter_query)
+    sort_by = [s for s in (sort_by or []) if s['column_id'] in df.columns]
+    if sort_by:
+        df = df.sort_values(
+            [s['column_id'] for s in sort_by],
+            ascending=[s['direction'] == 'asc' for s in sort_by],
+            kind='stable'
+        )
+    
+    page_size = page_size or 10
+    page_count = max(1, math.ceil(len(df) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    page = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page.to_dict('records'), page_count
 
 def create_visualization(df, selected_columns, chart_type, aggregation, group_by):
-    # Apply aggregation if specified
+    # Aggregated frames arrive already grouped by MySQL: one row per group_by value
     if aggregation and group_by and len(selected_columns) >= 2:
         agg_column = [col for col in selected_columns if col != group_by][0]
-        df = df.groupby(group_by).agg({agg_column: aggregation}).reset_index()
-        y_column = agg_column
+        x_column, y_column = group_by, agg_column
     elif len(selected_columns) >= 2:
         x_column, y_column = selected_columns[0], selected_columns[1]
     else:
         x_column, y_column = selected_columns[0], selected_columns[0]
+    # group_by only drives the x axis / colour when its column was fetched
+    group_column = group_by if group_by in df.columns else None
+    
+    # Past the point budget, charts are built from a reduced frame (or from
+    # precomputed statistics) so the figure JSON stays small
+    budget = settings.dashboard_point_budget
+    x_axis = group_column or x_column
+    if len(df) > budget:
+        df, fig = reduce_for_chart(df, chart_type, x_axis, x_column, y_column, group_column, budget)
+        if fig is not None:
+            return style_figure(fig)
     
     # Create visualization based on chart type
     if chart_type == 'bar':
-        fig = px.bar(df, x=group_by or x_column, y=y_column, 
+        fig = px.bar(df, x=x_axis, y=y_column, 
                     title=f"Student Data Analysis ({aggregation if aggregation else 'Values'})",
                     template="plotly_white")
     elif chart_type == 'pie':
-        fig = px.pie(df, names=group_by or x_column, values=y_column, 
+        fig = px.pie(df, names=x_axis, values=y_column, 
                     title="Student Data Distribution",
                     template="plotly_white")
     elif chart_type == 'scatter':
-        fig = px.scatter(df, x=x_column, y=y_column, color=group_by, 
+        fig = px.scatter(df, x=x_column, y=y_column, color=group_column, 
                         title="Student Data Correlation",
                         template="plotly_white")
     elif chart_type == 'histogram':
@@ -318,20 +557,23 @@ def create_visualization(df, selected_columns, chart_type, aggregation, group_by
                           title="Student Data Distribution",
                           template="plotly_white")
     elif chart_type == 'box':
-        fig = px.box(df, x=group_by or x_column, y=y_column, 
+        fig = px.box(df, x=x_axis, y=y_column, 
                     title="Student Data Statistics",
                     template="plotly_white")
     elif chart_type == 'line':
-        fig = px.line(df, x=group_by or x_column, y=y_column, 
+        fig = px.line(df, x=x_axis, y=y_column, 
                      title="Student Data Trend",
                      template="plotly_white")
     elif chart_type == 'violin':
-        fig = px.violin(df, x=group_by or x_column, y=y_column, 
+        fig = px.violin(df, x=x_axis, y=y_column, 
                        title="Student Data Distribution",
                        template="plotly_white")
     else:
         fig = px.scatter(title="Select a valid chart type")
     
+    return style_figure(fig)
+
+def style_figure(fig):
     fig.update_layout(
         transition_duration=500,
         hovermode='closest',
@@ -341,6 +583,47 @@ def create_visualization(df, selected_columns, chart_type, aggregation, group_by
     
     return fig
 
+# Shrink a frame over the point budget for one chart type. Returns the frame to
+# plot and, for charts drawn from precomputed statistics, the finished figure.
+def reduce_for_chart(df, chart_type, x_axis, x_column, y_column, group_column, budget):
+    rows = len(df)
+    fig = None
+    if chart_type in ('bar', 'pie') and x_axis != y_column and pd.api.types.is_numeric_dtype(df[y_column]):
+        # Stacked raw bars / repeated slices render the same as one summed value per x
+        df = df.groupby(x_axis, observed=True, sort=True)[y_column].sum().reset_index()
+    elif chart_type == 'histogram':
+        bins = histogram_bins(df[x_column], bins=20)
+        fig = px.bar(bins, x='x', y='count', labels={'x': x_column},
+                     title="Student Data Distribution", template="plotly_white")
+        if bins['width'].notna().all():
+            fig.update_traces(width=bins['width'].tolist())
+        fig.update_layout(bargap=0)
+    elif chart_type == 'box' and pd.api.types.is_numeric_dtype(df[y_column]):
+        stats = box_statistics(df, y_column, x_axis if x_axis != y_column else None)
+        fig = go.Figure(go.Box(
+            x=stats.index.tolist() if x_axis != y_column else None,
+            q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+            lowerfence=stats['lowerfence'], upperfence=stats['upperfence'], mean=stats['mean'],
+            name=y_column, boxpoints=False
+        ))
+        fig.update_layout(title="Student Data Statistics", template="plotly_white",
+                          xaxis_title=x_axis if x_axis != y_column else None, yaxis_title=y_column)
+    elif chart_type == 'line':
+        df = df.dropna(subset=list(dict.fromkeys([x_axis, y_column]))).sort_values(x_axis, kind='stable')
+        orderable = pd.api.types.is_numeric_dtype(df[x_axis]) or pd.api.types.is_datetime64_any_dtype(df[x_axis])
+        if settings.dashboard_line_downsampling == 'lttb' and orderable:
+            df = df.iloc[lttb(df[x_axis], df[y_column], budget)]
+        else:
+            df = df.iloc[minmax_decimate(df[y_column], budget)]
+    else:
+        # scatter, violin and anything left: keep every colour/category in proportion
+        groups = df[group_column] if chart_type == 'scatter' and group_column else (
+            df[x_axis] if chart_type != 'scatter' and x_axis != y_column else None)
+        df = df.iloc[stratified_sample(rows, budget, groups)]
+    print(f"📉 Downsampled {chart_type}: {rows:,} rows -> {len(df):,} points" if fig is None else
+          f"📉 {chart_type} drawn from precomputed statistics over {rows:,} rows")
+    return df, fig
+
 def generate_statistics(df, columns):
     stats = []
     for col in columns:
@@ -353,7 +636,9 @@ def generate_statistics(df, columns):
                 'max': df[col].max(),
                 'std': df[col].std()
             })
-    
+    return render_statistics(stats)
+
+def render_statistics(stats):
     if not stats:
         return html.P("No numeric columns for statistics", className="text-muted")
     
@@ -372,5 +657,6 @@ def generate_statistics(df, columns):
         ])
     ], bordered=True, hover=True, responsive=True)
 
+# Run from backend/ as `python -m app.student_dashboard` so the app package resolves
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
\ No newline at end of file
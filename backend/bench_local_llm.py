@@ -0,0 +1,100 @@
+# bench_local_llm.py
+"""Per-call overhead of fresh vs pooled HTTP connections to an OpenAI-compatible endpoint.
+
+    python bench_local_llm.py                                # in-process fake LLM, zero model latency
+    python bench_local_llm.py --url http://gpu-box:1234/v1   # real LM Studio/Ollama endpoint
+
+"before" mirrors the old LocalLLMService (requests.post / a new httpx.AsyncClient
+per call), "after" the pooled clients from app/http_clients.py.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from fake_llm_server import FakeLLMHandler
+
+PAYLOAD = {"messages": [{"role": "user", "content": "Write SQL: count students"}], "max_tokens": 16, "temperature": 0}
+
+
+def start_fake_server() -> str:
+    FakeLLMHandler.options = argparse.Namespace(
+        latency=0.0, jitter=0.0, slow_rate=0.0, slow_latency=0.0, token_latency=0.0, error_rate=0.0, quiet=True
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def timed(calls: int, func):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def atimed(calls: int, func):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<34} mean {statistics.mean(samples):7.2f} ms   p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="OpenAI-compatible base URL; defaults to an in-process fake server")
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+
+    base_url = args.url or start_fake_server()
+    endpoint = f"{base_url}/chat/completions"
+    print(f"📊 {args.calls} sequential calls to {endpoint}\n")
+
+    def fresh_sync():
+        requests.post(endpoint, json=PAYLOAD, timeout=120).raise_for_status()
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=0))
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=0))
+
+    def pooled_sync():
+        session.post(endpoint, json=PAYLOAD, timeout=120).raise_for_status()
+
+    async def run_async():
+        async def fresh_async():
+            async with httpx.AsyncClient(timeout=120) as client:
+                (await client.post(endpoint, json=PAYLOAD)).raise_for_status()
+
+        async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_keepalive_connections=20)) as shared:
+            async def pooled_async():
+                (await shared.post(endpoint, json=PAYLOAD)).raise_for_status()
+
+            await pooled_async()  # open the keep-alive connection
+            return await atimed(args.calls, fresh_async), await atimed(args.calls, pooled_async)
+
+    pooled_sync()
+    report("before: requests.post", timed(args.calls, fresh_sync))
+    report("after:  pooled requests.Session", timed(args.calls, pooled_sync))
+    fresh, pooled = asyncio.run(run_async())
+    report("before: httpx.AsyncClient per call", fresh)
+    report("after:  shared httpx.AsyncClient", pooled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# fake_llm_server.py
+"""OpenAI-compatible fake LLM for exercising timeouts, hedging and circuit breakers offline.
+
+    python fake_llm_server.py --port 1234 --latency 0.3 --slow-rate 0.05 --slow-latency 15 --error-rate 0.1
+
+Point the local provider at it (LOCAL_LLM_URL=http://localhost:1234/v1) and
+watch /api/v1/metrics/llm-providers while sending requests with provider=local.
+"""
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SQL_REPLY = "SELECT COUNT(*) AS total FROM students;"
+EXPLANATION_REPLY = "The query counted the matching students. The result shows the total number of rows returned."
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like real model servers
+    disable_nagle_algorithm = True
+    options = None
+
+    def log_message(self, format, *args):
+        if not self.options.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _stream(self, content: str):
+        """OpenAI-style server-sent events, one word per chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in re.findall(r"\S+\s*", content):
+            time.sleep(self.options.token_latency)
+            event = {"choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"data": [{"id": "fake-llm", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+
+        opts = self.options
+        delay = opts.latency + random.uniform(0, opts.jitter)
+        if random.random() < opts.slow_rate:
+            delay = opts.slow_latency
+        time.sleep(delay)
+
+        if random.random() < opts.error_rate:
+            self._send_json(503, {"error": {"message": "fake upstream overloaded"}})
+            return
+
+        text = prompt.lower()
+        content = SQL_REPLY if "sql" in text and "returned these results" not in text else EXPLANATION_REPLY
+        if request.get("stream"):
+            self._stream(content)
+            return
+        self._send_json(200, {
+            "id": f"fake-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "model": "fake-llm",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--latency", type=float, default=0.2, help="base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="uniform extra latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests that take --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=10.0)
+    parser.add_argument("--token-latency", type=float, default=0.02, help="delay between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    parser.add_argument("--quiet", action="store_true")
+    FakeLLMHandler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((FakeLLMHandler.options.host, FakeLLMHandler.options.port), FakeLLMHandler)
+    print(f"🧪 Fake LLM listening on http://{FakeLLMHandler.options.host}:{FakeLLMHandler.options.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
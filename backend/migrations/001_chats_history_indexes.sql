@@ -0,0 +1,12 @@
+-- Composite indexes backing keyset pagination of chat history
+-- (GET /chat/chat-history/{conversation_id} and GET /chat/user-chats/{user_id}).
+--
+-- InnoDB appends the primary key to every secondary index, so these also
+-- cover the (created_at, id) tie-breaker used by the page cursors.
+--
+-- Apply with: mysql -u <user> -p <database> < migrations/001_chats_history_indexes.sql
+
+ALTER TABLE chats
+    ADD INDEX idx_chats_conversation_created (conversation_id, created_at),
+    ADD INDEX idx_chats_user_created (user_id, created_at),
+    ALGORITHM = INPLACE, LOCK = NONE;
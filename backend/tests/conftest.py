@@ -0,0 +1,6 @@
+import os
+
+# app.config builds Settings at import time; these are the required fields.
+# Nothing in the test suite talks to a real database or LLM provider.
+for name in ("COHERE_API_KEY", "GOOGLE_API_KEY", "OPENAI_API_KEY", "DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME"):
+    os.environ.setdefault(name, "test")
@@ -0,0 +1,49 @@
+from app.chat_writer import ChatWriteQueue
+
+
+class FakeDB:
+    def __init__(self, bad=(), flaky=()):
+        self.bad = set(bad)
+        self.flaky = dict.fromkeys(flaky, 1)
+        self.saved = []
+        self.calls = 0
+
+    def save_chats(self, rows):
+        self.calls += 1
+        for row in rows:
+            if row in self.bad:
+                raise ValueError(f"bad row {row}")
+            if self.flaky.get(row):
+                self.flaky[row] -= 1
+                raise ConnectionError("lost connection")
+        self.saved.extend(rows)
+
+
+def test_batch_is_written_in_one_call():
+    db = FakeDB()
+    writer = ChatWriteQueue(db)
+    writer._write([(1,), (2,), (3,)])
+    assert db.saved == [(1,), (2,), (3,)]
+    assert db.calls == 1
+    assert writer.stats()["written"] == 3
+
+
+def test_bad_row_only_loses_itself():
+    db = FakeDB(bad=[(2,)])
+    writer = ChatWriteQueue(db, row_retries=1)
+    writer._write([(1,), (2,), (3,)])
+    stats = writer.stats()
+    assert db.saved == [(1,), (3,)]
+    assert stats["written"] == 2
+    assert stats["failed_rows"] == 1
+    assert stats["failed_batches"] == 1
+    # batch + row 1 + two attempts at row 2 + row 3
+    assert db.calls == 5
+
+
+def test_transient_row_failure_is_retried():
+    db = FakeDB(flaky=[(2,)])
+    writer = ChatWriteQueue(db, row_retries=2)
+    writer._write([(1,), (2,)])
+    assert sorted(db.saved) == [(1,), (2,)]
+    assert writer.stats()["failed_rows"] == 0
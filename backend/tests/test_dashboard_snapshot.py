@@ -0,0 +1,100 @@
+import re
+import threading
+import time
+
+from app.dashboard_snapshot import ColumnarSnapshot
+
+
+class FakeSchemaCache:
+    def __init__(self, extra_columns=()):
+        self.marker = 1
+        self.gate = threading.Event()
+        self.gate.set()
+        self.extra_columns = list(extra_columns)
+
+    def get_columns(self):
+        return [("id", "int", None), ("gpa", "decimal", None), ("state", "varchar", None)] + self.extra_columns
+
+    def fetch_marker(self):
+        self.gate.wait(5)
+        return self.marker
+
+
+class FakeDB:
+    def __init__(self, rows, extra_columns=()):
+        self.rows = rows
+        self.schema_cache = FakeSchemaCache(extra_columns)
+        self.params = []
+
+    def execute_query(self, query, params=None, max_rows=None):
+        if "COUNT(*)" in query:
+            return [{"n": len(self.rows)}]
+        columns = re.findall(r"`(\w+)`", query.split(" FROM ")[0])
+        rows = self.rows
+        if params:
+            self.params.append(params)
+            where = re.findall(r"`(\w+)` (>=|>) %s", query.split(" WHERE ")[-1])
+            for (column, op), value in zip(where, params):
+                rows = [r for r in rows if (r[column] >= value if op == ">=" else r[column] > value)]
+        limit = int(re.search(r"LIMIT (\d+)", query).group(1))
+        return [{c: r[c] for c in columns} for r in rows[:limit]]
+
+
+def make_snapshot():
+    rows = [{"id": i, "gpa": 2 + i / 10, "state": "CA" if i % 2 else "NY"} for i in range(1, 11)]
+    return ColumnarSnapshot(FakeDB(rows), updated_column=None, check_interval=0, batch_size=4)
+
+
+def test_loads_requested_columns():
+    snapshot = make_snapshot()
+    frame = snapshot.select(["state", "gpa"])
+    assert len(frame) == 10
+    assert list(frame.columns) == ["state", "gpa"]
+    assert snapshot.stats()["full_loads"] == 1
+
+
+def test_readers_are_served_while_a_refresh_is_running():
+    snapshot = make_snapshot()
+    snapshot.select(["gpa"])
+    db = snapshot.db_manager
+    db.schema_cache.gate.clear()
+
+    refresher = threading.Thread(target=snapshot.select, args=(["gpa"],))
+    refresher.start()
+    time.sleep(0.1)
+    # The refresher is stuck reading the marker and holds the lock
+    assert snapshot._lock.locked()
+
+    started = time.monotonic()
+    frame = snapshot.select(["gpa"])
+    assert time.monotonic() - started < 1
+    assert len(frame) == 10
+
+    db.schema_cache.gate.set()
+    refresher.join(5)
+    assert not refresher.is_alive()
+
+
+def test_new_rows_are_appended_after_marker_change():
+    snapshot = make_snapshot()
+    snapshot.select(["gpa"])
+    db = snapshot.db_manager
+    db.rows.append({"id": 11, "gpa": 4.0, "state": "TX"})
+    db.schema_cache.marker = 2
+    assert len(snapshot.select(["gpa"])) == 11
+    assert snapshot.stats()["incremental_loads"] == 1
+
+
+def test_integer_updated_column_catches_up():
+    rows = [{"id": i, "gpa": 2 + i / 10, "state": "CA", "version": 1} for i in range(1, 6)]
+    db = FakeDB(rows, extra_columns=[("version", "bigint", None)])
+    snapshot = ColumnarSnapshot(db, updated_column="version", check_interval=0, batch_size=4)
+    snapshot.select(["gpa"])
+    rows[2].update(gpa=3.9, version=2)
+    db.schema_cache.marker = 2
+    frame = snapshot.select(["gpa"])
+    assert frame["gpa"].tolist() == [2.1, 2.2, 3.9, 2.4, 2.5]
+    assert snapshot.stats()["incremental_loads"] == 1
+    # The last seen version goes to the driver as a plain int
+    since = db.params[-1][0]
+    assert type(since) is int and since == 1
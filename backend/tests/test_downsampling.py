@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.downsampling import lttb, minmax_decimate
+
+
+def noisy_line(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 50) * 10 + rng.normal(0, 1, n)
+    y[n // 3] = 100  # a spike the downsampled line must keep
+    return x, y
+
+
+@pytest.mark.parametrize("n,threshold", [(10_000, 500), (1_001, 100), (50, 3)])
+def test_lttb_keeps_boundaries_and_budget(n, threshold):
+    x, y = noisy_line(n)
+    picked = lttb(x, y, threshold)
+    assert len(picked) == threshold
+    assert picked[0] == 0 and picked[-1] == n - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_lttb_keeps_the_spike_and_short_series():
+    x, y = noisy_line(10_000)
+    assert 10_000 // 3 in lttb(x, y, 500)
+    assert list(lttb(x[:20], y[:20], 500)) == list(range(20))
+
+
+def test_lttb_accepts_datetimes():
+    x = pd.date_range("2024-01-01", periods=1_000, freq="h")
+    picked = lttb(x, np.arange(1_000), 100)
+    assert len(picked) == 100 and picked[-1] == 999
+
+
+@pytest.mark.parametrize("n,threshold", [(10_000, 500), (1_001, 101), (50, 3), (50, 1)])
+def test_minmax_keeps_boundaries_and_budget(n, threshold):
+    _, y = noisy_line(n)
+    picked = minmax_decimate(y, threshold)
+    assert 0 < len(picked) <= threshold
+    assert picked[0] == 0
+    if threshold > 1:
+        assert picked[-1] == n - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_minmax_keeps_extremes():
+    _, y = noisy_line(10_000)
+    picked = minmax_decimate(y, 500)
+    assert int(np.argmax(y)) in picked and int(np.argmin(y)) in picked
+    assert list(minmax_decimate(y[:20], 500)) == list(range(20))
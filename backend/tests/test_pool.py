@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from app.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise OSError("server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, **config):
+        conn = FakeConnection(len(self.opened) + 1)
+        self.opened.append(conn)
+        return conn
+
+
+def make_pool(**options):
+    connector = FakeConnector()
+    options = {"pool_size": 2, "max_overflow": 1, "pool_timeout": 0.2, **options}
+    return ConnectionPool({}, connector=connector, **options), connector
+
+
+def test_checkout_reuses_returned_connection():
+    pool, connector = make_pool()
+    with pool.get_connection() as conn:
+        first = conn.number
+    with pool.get_connection() as conn:
+        assert conn.number == first
+    stats = pool.stats()
+    assert len(connector.opened) == 1
+    assert stats["open"] == 1 and stats["idle"] == 1 and stats["checked_out"] == 0
+    assert stats["checkouts"] == 2 and stats["waiting"] == 0
+
+
+def test_overflow_connections_are_closed_on_return():
+    pool, connector = make_pool()
+    conns = [pool.get_connection() for _ in range(3)]
+    assert pool.stats()["overflow"] == 1
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+    for conn in conns:
+        conn.close()
+    stats = pool.stats()
+    assert stats["open"] == 2 and stats["idle"] == 2 and stats["timeouts"] == 1
+    assert [c.closed for c in connector.opened] == [False, False, True]
+
+
+def test_waiting_counts_only_blocked_callers():
+    pool, _ = make_pool(pool_size=1, max_overflow=0, pool_timeout=5)
+    held = pool.get_connection()
+    assert pool.stats()["waiting"] == 0
+
+    waiter = threading.Thread(target=lambda: pool.get_connection().close())
+    waiter.start()
+    deadline = time.monotonic() + 2
+    while pool.stats()["waiting"] != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["waiting"] == 1
+
+    held.close()
+    waiter.join(2)
+    assert not waiter.is_alive()
+    assert pool.stats()["waiting"] == 0
+
+
+def test_old_connections_are_recycled():
+    pool, connector = make_pool(pool_recycle=0.05, idle_timeout=0)
+    pool.get_connection().close()
+    time.sleep(0.1)
+    with pool.get_connection() as conn:
+        assert conn.number == 2
+    assert connector.opened[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_stale_connection_is_replaced_after_failed_ping():
+    pool, connector = make_pool()
+    pool.get_connection().close()
+    connector.opened[0].alive = False
+    with pool.get_connection() as conn:
+        assert conn.number == 2
+    assert connector.opened[0].closed
+    stats = pool.stats()
+    assert stats["ping_failures"] == 1 and stats["open"] == 1
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from argparse import Namespace
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app.services.base import BaseLLMService, FallbackText, fallback_explanation
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.local_service import LocalLLMService
+from app.services.resilience import (
+    FallbackLLMService, ProviderGuard, ProviderTimeoutError, ResilientLLMService, fallback_stats
+)
+from app.services.race_service import RaceLLMService
+from app.sql_validation import CheckedSQL
+from fake_llm_server import EXPLANATION_REPLY, FakeLLMHandler
+
+
+class FakeOptions(Namespace):
+    """fake_llm_server options; the next ``slow_calls`` requests take ``slow_latency``."""
+
+    def __init__(self, **overrides):
+        super().__init__(**{
+            "latency": 0.02, "jitter": 0.0, "slow_latency": 1.0, "token_latency": 0.0,
+            "error_rate": 0.0, "quiet": True, "slow_calls": 0, **overrides,
+        })
+        self._lock = threading.Lock()
+
+    @property
+    def slow_rate(self):
+        with self._lock:
+            if self.slow_calls:
+                self.slow_calls -= 1
+                return 1.0
+            return 0.0
+
+
+@pytest.fixture
+def fake_llm():
+    servers = []
+
+    def start(**overrides):
+        options = FakeOptions(**overrides)
+        handler = type("Handler", (FakeLLMHandler,), {"options": options})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1", options
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def resilient(url, name="local", **guard_options):
+    breaker = CircuitBreaker(name, guard_options.pop("failure_threshold", 5), guard_options.pop("reset_timeout", 30))
+    return ResilientLLMService(LocalLLMService(url), ProviderGuard(name, breaker, **guard_options))
+
+
+async def ask(service, times=1):
+    for _ in range(times):
+        result = await service.agenerate_text("explain these results")
+    return result
+
+
+def test_timeout_adapts_to_observed_latency(fake_llm):
+    url, options = fake_llm(latency=0.02)
+    service = resilient(url, min_samples=5, min_timeout=0.1, max_timeout=30, timeout_multiplier=3, hedging=False)
+    guard = service.guard
+    assert guard.timeout("text") == 30
+
+    asyncio.run(ask(service, 5))
+    adapted = guard.timeout("text")
+    assert 0.1 <= adapted < 1
+
+    # A response slower than the learned timeout is cut off and fed back as a sample
+    options.slow_calls = 1
+    with pytest.raises(ProviderTimeoutError):
+        asyncio.run(ask(service))
+    assert guard.stats()["timeouts"] == 1
+    assert guard.timeout("text") > adapted
+
+
+def test_slow_request_is_hedged(fake_llm):
+    url, options = fake_llm(latency=0.02, slow_latency=2.0)
+    service = resilient(url, min_samples=5, min_timeout=5, max_timeout=30, hedge_percentile=0.95)
+    asyncio.run(ask(service, 5))
+    assert service.guard.hedge_delay("text") < 0.5
+
+    options.slow_calls = 1
+    started = time.monotonic()
+    assert asyncio.run(ask(service)) == EXPLANATION_REPLY
+    assert time.monotonic() - started < 1.5
+    stats = service.guard.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_no_hedging_before_enough_samples(fake_llm):
+    url, _ = fake_llm()
+    service = resilient(url, min_samples=5)
+    asyncio.run(ask(service, 2))
+    assert service.guard.hedge_delay("text") is None
+    assert service.guard.stats()["hedges"] == 0
+
+
+def test_failing_provider_falls_back_and_opens_its_circuit(fake_llm):
+    broken_url, _ = fake_llm(error_rate=1.0)
+    healthy_url, _ = fake_llm()
+    primary = resilient(broken_url, name="broken", failure_threshold=2)
+    backup = resilient(healthy_url, name="healthy")
+    service = FallbackLLMService({"broken": primary, "healthy": backup})
+    before = fallback_stats().get("broken->healthy", 0)
+
+    assert asyncio.run(ask(service, 3)) == EXPLANATION_REPLY
+    assert fallback_stats()["broken->healthy"] - before == 3
+    assert primary.guard.stats()["failures"] == 2
+    assert primary.guard.breaker.state == CircuitBreaker.OPEN
+    # The third call was answered without waiting on the open circuit
+    assert primary.guard.breaker.stats()["rejected"] == 1
+
+
+def test_explanation_failure_reaches_the_breaker(fake_llm):
+    url, _ = fake_llm(error_rate=1.0)
+    service = resilient(url, failure_threshold=1)
+    with pytest.raises(ValueError):
+        asyncio.run(service.aexplain_results("SELECT 1;", [{"n": 1}], "how many?"))
+    assert service.guard.breaker.state == CircuitBreaker.OPEN
+
+
+def test_all_providers_open_raises_circuit_open(fake_llm):
+    url, _ = fake_llm(error_rate=1.0)
+    first = resilient(url, name="a", failure_threshold=1)
+    second = resilient(url, name="b", failure_threshold=1)
+    service = FallbackLLMService({"a": first, "b": second})
+    with pytest.raises(ValueError):
+        asyncio.run(ask(service))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(ask(service))
+
+
+def test_race_returns_the_validators_checked_sql(fake_llm):
+    url, _ = fake_llm()
+    checked = []
+
+    async def validator(sql_query):
+        checked.append(sql_query)
+        return CheckedSQL("SELECT COUNT(*) AS total FROM students LIMIT 100")
+
+    service = RaceLLMService({"local": LocalLLMService(url)}, validator=validator)
+    sql_query = asyncio.run(service.agenerate_sql_query("how many students?", "Table: students"))
+    assert isinstance(sql_query, CheckedSQL)
+    assert checked == ["SELECT COUNT(*) AS total FROM students;"]
+
+
+def half_open_guard():
+    breaker = CircuitBreaker("trial", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    return ProviderGuard("trial", breaker)
+
+
+def test_cancelled_trial_call_frees_the_half_open_slot():
+    guard = half_open_guard()
+
+    async def cancel_midway():
+        task = asyncio.ensure_future(guard.call("text", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert guard.breaker.allow()
+
+
+def test_interrupted_sync_trial_call_frees_the_half_open_slot():
+    guard = half_open_guard()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        guard.call_sync("text", interrupted)
+    assert guard.breaker.allow()
+
+
+def test_streamed_fallback_chunks_stay_marked():
+    class Failing(BaseLLMService):
+        def generate_sql_query(self, natural_language, schema):
+            raise ValueError("provider down")
+
+        def explain_results(self, query, results, question):
+            return fallback_explanation(results, ValueError("provider down"))
+
+        def _generate_text(self, prompt, max_tokens=300, temperature=0.1):
+            raise ValueError("provider down")
+
+    async def chunks():
+        return [c async for c in Failing().stream_explanation("SELECT 1;", [{"n": 1}], "q")]
+
+    streamed = asyncio.run(chunks())
+    assert len(streamed) > 1
+    assert all(isinstance(chunk, FallbackText) for chunk in streamed)
@@ -0,0 +1,31 @@
+import pytest
+
+from app.result_cache import QueryResultCache
+
+
+@pytest.fixture
+def cache():
+    return QueryResultCache(lambda: 1)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM students",
+    "SELECT state, COUNT(*) FROM `students` GROUP BY state",
+    "SELECT * FROM students s, students t WHERE s.id = t.id",
+    "SELECT * FROM (SELECT id FROM students) AS t",
+    "SELECT * FROM students WHERE id IN (SELECT id FROM students WHERE gpa > 3)",
+])
+def test_single_table_reads_are_cacheable(cache, sql):
+    assert cache.cacheable(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM students s, fraud_rings r WHERE s.ring_id = r.id",
+    "SELECT * FROM students, fraud_rings",
+    "SELECT * FROM students s JOIN fraud_rings r ON s.ring_id = r.id",
+    "SELECT * FROM students s, (SELECT id FROM fraud_rings) r",
+    "SELECT * FROM students WHERE id IN (SELECT student_id FROM fraud_rings)",
+    "SELECT * FROM fraud_rings",
+])
+def test_other_tables_are_not_cacheable(cache, sql):
+    assert not cache.cacheable(sql)
@@ -0,0 +1,45 @@
+import json
+
+from app.result_codec import StoredResults, decode_results, encode_results, result_count
+
+ROWS = [{"state": "CA", "n": i} for i in range(200)]
+
+
+def test_round_trip_compressed():
+    stored = encode_results(ROWS, compress_min_bytes=0)
+    assert "codec" in json.loads(stored)
+    assert result_count(stored) == 200
+    assert decode_results(stored) == ROWS
+
+
+def test_round_trip_truncated():
+    stored = encode_results(ROWS, max_rows=10, compression=None)
+    assert result_count(stored) == 200
+    assert decode_results(stored) == ROWS[:10]
+
+
+def test_legacy_list_is_returned_as_is():
+    stored = json.dumps(ROWS[:3])
+    assert result_count(stored) == 3
+    assert decode_results(stored) == ROWS[:3]
+
+
+def test_malformed_json_falls_back_to_raw_value():
+    stored = '[{"state": "CA"'
+    assert result_count(stored) is None
+    assert decode_results(stored) == stored
+
+
+def test_corrupt_payload_falls_back_to_raw_value():
+    stored = json.dumps({"v": 1, "total": 5, "truncated": False, "codec": "zlib", "data": "bm90IHpsaWI="})
+    results = StoredResults(stored)
+    assert results.total == 5
+    assert results.rows == stored
+
+
+def test_rows_are_decoded_only_when_asked():
+    results = StoredResults(encode_results(ROWS, compress_min_bytes=0))
+    assert results.total == 200
+    assert results._decoded is False
+    assert results.rows == ROWS
+    assert results._decoded is True
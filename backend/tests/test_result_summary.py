@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.result_summary import condense_results, estimate_tokens
+
+
+def rows(n, width):
+    return [
+        {f"col_{c}": (i * c if c % 3 else f"value {i % 7} " + "x" * 60) for c in range(width)}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n,width", [(5, 3), (200, 8), (20_000, 6), (20, 300), (2_000, 150)])
+@pytest.mark.parametrize("budget", [200, 1500])
+def test_condensed_text_fits_the_token_budget(n, width, budget):
+    text = condense_results(rows(n, width), token_budget=budget)
+    assert estimate_tokens(text) <= budget
+
+
+def test_small_results_pass_through():
+    text = condense_results([{"state": "CA", "students": 3}, {"state": "NY", "students": 2}])
+    assert text == "Row 1: state: CA, students: 3\nRow 2: state: NY, students: 2"
+
+
+def test_large_results_are_summarized():
+    text = condense_results(rows(20_000, 6), token_budget=1500)
+    assert text.startswith("20000 rows, 6 columns.")
+
+
+def test_empty_results():
+    assert condense_results([]) == "No rows returned."
@@ -0,0 +1,42 @@
+import pytest
+
+from app.services.semantic_cache import SemanticSQLCache
+
+SCHEMA = "Table: students\nColumns:\n- id: int (int)\n- fraud_ring_flag: tinyint (tinyint(1))\n"
+
+
+@pytest.fixture
+def cache():
+    # Low enough that every pair below is a vector match; only the key terms tell them apart
+    return SemanticSQLCache(threshold=0.8)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("how many students are flagged as fraud ring", "how many students are not flagged as fraud ring"),
+    ("how many students are in a fraud ring", "how many students are not in a fraud ring"),
+    ("how many students have a fraud ring", "how many students do not have a fraud ring"),
+    ("how many students have a fraud ring", "how many students don't have a fraud ring"),
+    ("list students with a fraud ring", "list students without a fraud ring"),
+])
+def test_negated_question_does_not_reuse_sql(cache, stored, asked):
+    cache.set(stored, "cohere", SCHEMA, "SELECT COUNT(*) FROM students WHERE fraud_ring_flag = 1;")
+    assert cache.get(asked, "cohere", SCHEMA) is None
+    assert cache.stats()["rejected_key_terms"] == 1
+
+
+def test_paraphrase_still_hits(cache):
+    sql = "SELECT COUNT(*) FROM students WHERE fraud_ring_flag = 0;"
+    cache.set("how many students are not in a fraud ring", "cohere", SCHEMA, sql)
+    assert cache.get("How many students are not in a fraud ring?", "cohere", SCHEMA) == sql
+
+
+def test_numbers_must_match(cache):
+    cache.set("top 5 students by fraud_rating", "cohere", SCHEMA, "SELECT 5;")
+    assert cache.get("top 10 students by fraud_rating", "cohere", SCHEMA) is None
+
+
+def test_storing_same_sql_twice_keeps_one_entry(cache):
+    sql = "SELECT COUNT(*) FROM students;"
+    cache.set("how many students are there", "cohere", SCHEMA, sql)
+    cache.set("How many students are there?", "cohere", SCHEMA, sql)
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.sql_templates import TemplateMatcher
+
+SCHEMA = (
+    "Table: students\nColumns:\n"
+    "- id: int (int)\n"
+    "- fraud_level: varchar (varchar(20))\n"
+    "- fraud_rating: decimal (decimal(5,2))\n"
+    "- state: varchar (varchar(2))\n"
+)
+
+
+@pytest.fixture
+def matcher():
+    return TemplateMatcher()
+
+
+def test_single_text_value(matcher):
+    assert matcher.match("how many students with fraud_level of low", SCHEMA) == (
+        "SELECT COUNT(*) AS total FROM `students` WHERE `fraud_level` = 'low';"
+    )
+
+
+@pytest.mark.parametrize("question", [
+    "how many students with fraud_level of low or medium",
+    "how many students with fraud_level of low and medium",
+    "how many students with fraud_level of not low",
+    "how many students with fraud_level of high but active",
+])
+def test_compound_values_go_to_the_llm(matcher, question):
+    assert matcher.match(question, SCHEMA) is None
+
+
+def test_numeric_comparison(matcher):
+    assert matcher.match("how many students with fraud_rating above 0.5", SCHEMA) == (
+        "SELECT COUNT(*) AS total FROM `students` WHERE `fraud_rating` > 0.5;"
+    )
+
+
+def test_matches_leaves_stats_untouched(matcher):
+    question = "how many students with fraud_level of low"
+    matcher.match(question, SCHEMA)
+    matcher.match("which students look suspicious", SCHEMA)
+    before = matcher.stats()
+    assert matcher.matches(question, SCHEMA)
+    assert not matcher.matches("which students look suspicious", SCHEMA)
+    assert matcher.stats() == before == {"hits": {"count": 1}, "misses": 1, "hit_rate": 0.5}
@@ -0,0 +1,84 @@
+import pytest
+
+from app.sql_validation import SQLValidationError, add_max_execution_time, enforce_limit, validate_select
+
+
+def test_enforce_limit_appends_limit():
+    assert enforce_limit("SELECT * FROM students", 100) == "SELECT * FROM students LIMIT 100"
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM students -- all rows",
+    "SELECT * FROM students # all rows",
+    "SELECT * FROM students /* every row */",
+])
+def test_enforce_limit_is_not_swallowed_by_trailing_comment(sql):
+    limited = enforce_limit(validate_select(sql), 10000)
+    assert limited == "SELECT * FROM students LIMIT 10000"
+
+
+def test_enforce_limit_keeps_optimizer_hints():
+    limited = enforce_limit("SELECT /*+ BKA(s) */ id FROM students s -- note", 10)
+    assert limited == "SELECT /*+ BKA(s) */ id FROM students s LIMIT 10"
+
+
+def test_enforce_limit_caps_existing_limit():
+    assert enforce_limit("SELECT id FROM students LIMIT 50000", 100) == "SELECT id FROM students LIMIT 100"
+    assert enforce_limit("SELECT id FROM students LIMIT 10, 50000", 100) == "SELECT id FROM students LIMIT 10, 100"
+    assert enforce_limit("SELECT id FROM students LIMIT 5", 100) == "SELECT id FROM students LIMIT 5"
+
+
+def test_enforce_limit_rejects_non_literal_limit():
+    with pytest.raises(SQLValidationError):
+        enforce_limit("SELECT id FROM students LIMIT @n", 100)
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM students",
+    "SELECT 1; DROP TABLE students",
+    "SELECT * FROM students INTO OUTFILE '/tmp/x'",
+])
+def test_validate_select_rejects_writes(sql):
+    with pytest.raises(SQLValidationError):
+        validate_select(sql)
+
+
+def test_validate_select_allows_keywords_in_literals():
+    assert validate_select("SELECT * FROM students WHERE note = 'drop table';") == \
+        "SELECT * FROM students WHERE note = 'drop table'"
+
+
+def test_max_execution_time_hint_goes_after_ctes():
+    sql = "WITH t AS (SELECT id FROM students) SELECT id FROM t"
+    assert add_max_execution_time(sql, 500) == \
+        "WITH t AS (SELECT id FROM students) SELECT /*+ MAX_EXECUTION_TIME(500) */ id FROM t"
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT LOAD_FILE('/etc/passwd')",
+    "SELECT id, load_file('/etc/passwd') AS f FROM students",
+    "SELECT * FROM mysql.user",
+    "SELECT * FROM `mysql`.`user`",
+    "SELECT table_name FROM information_schema.tables",
+    "SELECT * FROM students.students",
+    "SELECT * FROM chats",
+    "SELECT * FROM students s, chats c",
+    "SELECT * FROM students s JOIN mysql.user u ON 1 = 1",
+    "SELECT * FROM students WHERE id IN (SELECT user_id FROM chats)",
+    "SELECT (SELECT COUNT(*) FROM information_schema.columns) AS n FROM students",
+])
+def test_validate_select_rejects_other_tables_and_file_reads(sql):
+    with pytest.raises(SQLValidationError):
+        validate_select(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT COUNT(*) FROM students",
+    "SELECT s.id FROM students s, students t WHERE s.id = t.id",
+    "SELECT EXTRACT(YEAR FROM enrollment_date) AS y, COUNT(*) FROM students GROUP BY y",
+    "SELECT TRIM(LEADING '0' FROM zip) FROM students",
+    "WITH rings AS (SELECT id FROM students WHERE fraud_ring > 0) SELECT COUNT(*) FROM rings",
+    "SELECT * FROM (SELECT state, COUNT(*) AS n FROM students GROUP BY state) AS t",
+])
+def test_validate_select_allows_students_queries(sql):
+    assert validate_select(sql)
@@ -1,11 +1,11 @@
 import React, { useState, useRef, useEffect } from "react";
-import { ChatMessage } from "../../utils/queryResultRow";
+import { ChatMessage, QueryResultRow } from "../../utils/queryResultRow";
 import Header from "../Common/Header";
 import InputArea from "../Common/InputArea";
 import MessageBubble from "./MessageBubble";
 import EmptyState from "./EmptyState";
 import LoadingIndicator from "./LoadingIndicator";
-import { chatService, ApiErrorDetail } from "@/services/chatService";
+import { chatService, ApiErrorDetail, DEFAULT_PROVIDER } from "@/services/chatService";
 
 const ChatWindow = () => {
   const userId = "1";
@@ -83,33 +83,58 @@ const ChatWindow = () => {
     fetchChats();
   }, []);
 
-  const handleSend = async () => {
-    if (!input.trim()) return;
-
-    const userMessage: ChatMessage = {
-      role: "user",
-      content: input,
-      timestamp: new Date().toISOString(),
-    };
-
-    setMessages((prev) => [...prev, userMessage]);
-    setInput("");
+  // New and edited messages take the same streaming path so replies match
+  const streamReply = async (message: string) => {
     setLoading(true);
     setIsTyping(true);
 
-    try {
-      const response = await chatService.sendMessage(input);
-
-      const botMessage: ChatMessage = {
-        role: "bot",
-        content: response.explanation,
-        timestamp: new Date().toISOString(),
-        sqlQuery: response.sql_query,
-        queryResults: JSON.stringify(response.results),
-        provider: response.provider,
-      };
+    // Render the bot reply progressively as stream events arrive
+    const botTimestamp = new Date().toISOString();
+    let rows: QueryResultRow[] = [];
+    const updateBotMessage = (update: Partial<ChatMessage>) => {
+      setMessages((prev) => {
+        const isStreamingReply = (msg: ChatMessage) =>
+          msg.role === "bot" && msg.timestamp === botTimestamp;
+        if (!prev.some(isStreamingReply)) {
+          return [
+            ...prev,
+            {
+              role: "bot",
+              content: "",
+              timestamp: botTimestamp,
+              provider: DEFAULT_PROVIDER,
+              ...update,
+            },
+          ];
+        }
+        return prev.map((msg) =>
+          isStreamingReply(msg) ? { ...msg, ...update } : msg
+        );
+      });
+    };
 
-      setMessages((prev) => [...prev, botMessage]);
+    try {
+      let explanation = "";
+      let sqlDraft = "";
+      await chatService.streamMessage(message, {
+        onSqlToken: (token) => {
+          setIsTyping(false);
+          sqlDraft += token;
+          updateBotMessage({ sqlQuery: sqlDraft });
+        },
+        onSql: (sqlQuery, provider) => {
+          setIsTyping(false);
+          updateBotMessage({ sqlQuery, queryResults: "[]", provider });
+        },
+        onRows: (chunk) => {
+          rows = [...rows, ...chunk];
+          updateBotMessage({ queryResults: JSON.stringify(rows) });
+        },
+        onExplanationToken: (token) => {
+          explanation += token;
+          updateBotMessage({ content: explanation });
+        },
+      });
     } catch (error) {
       const errorDetail = error as ApiErrorDetail;
       
@@ -126,47 +151,29 @@ const ChatWindow = () => {
     }
   };
 
-  const handleEditMessage = async (newMessage: string) => {
-    if (editingMessageId === null) return;
-    
-    try {
-      // Update the message in local state first for instant feedback
-      setMessages(prev => prev.map((msg, idx) => 
-        idx === editingMessageId ? { ...msg, content: newMessage } : msg
-      ));
-      
-      // Send the edited message to the backend
-      setLoading(true);
-      setIsTyping(true);
+  const handleSend = async () => {
+    if (!input.trim()) return;
 
-      const response = await chatService.sendMessage(newMessage);
+    const userMessage: ChatMessage = {
+      role: "user",
+      content: input,
+      timestamp: new Date().toISOString(),
+    };
 
-      const botMessage: ChatMessage = {
-        role: "bot",
-        content: response.explanation,
-        timestamp: new Date().toISOString(),
-        sqlQuery: response.sql_query,
-        queryResults: JSON.stringify(response.results),
-        provider: response.provider,
-      };
+    setMessages((prev) => [...prev, userMessage]);
+    setInput("");
+    await streamReply(input);
+  };
 
-      // Replace the old conversation with the new one
-      setMessages(prev => [
-        ...prev.slice(0, editingMessageId + 1),
-        botMessage
-      ]);
-      
-    } catch (error) {
-      const errorDetail = error as ApiErrorDetail;
-      const errorMessageObj: ChatMessage = {
-        role: "error",
-        content: JSON.stringify(errorDetail),
-        timestamp: new Date().toISOString(),
-      };
-      setMessages(prev => [...prev, errorMessageObj]);
+  const handleEditMessage = async (index: number, newMessage: string) => {
+    // Replace the old conversation from the edited message on
+    setMessages(prev => prev.slice(0, index + 1).map((msg, idx) =>
+      idx === index ? { ...msg, content: newMessage } : msg
+    ));
+
+    try {
+      await streamReply(newMessage);
     } finally {
-      setLoading(false);
-      setIsTyping(false);
       setEditingMessageId(null);
     }
   };
@@ -268,7 +275,7 @@ const ChatWindow = () => {
                   toggleDetails={() => toggleDetails(index)}
                   onEditMessage={(newMessage) => {
                     setEditingMessageId(index);
-                    handleEditMessage(newMessage);
+                    handleEditMessage(index, newMessage);
                   }}
                   isEditing={editingMessageId === index}
                   onSaveEdit={() => setEditingMessageId(null)}
@@ -4,6 +4,9 @@ import { QueryResultRow } from "@/utils/queryResultRow";
 
 const API_BASE_URL = "http://localhost:8000/api/v1/chat";
 
+// New and edited messages both go through /chat-with-db/stream with this provider
+export const DEFAULT_PROVIDER = "cohere";
+
 export interface ApiErrorDetail {
   error: string;
   message: string;
@@ -20,6 +23,21 @@ interface ChatItem {
   created_at: string;
 }
 
+interface ChatPage {
+  limit: number;
+  has_more: boolean;
+  before: string | null;
+  after: string | null;
+}
+
+interface UserChatsResponse {
+  chats: ChatItem[];
+  page: ChatPage;
+}
+
+// Largest page the backend serves (history_max_page_size)
+const HISTORY_PAGE_SIZE = 500;
+
 interface ChatResponse {
   explanation: string;
   sql_query: string;
@@ -28,6 +46,14 @@ interface ChatResponse {
   result_count?: number;
 }
 
+export interface StreamHandlers {
+  onSqlToken?: (token: string) => void;
+  onSql?: (sqlQuery: string, provider: string) => void;
+  onRows?: (rows: QueryResultRow[], offset: number) => void;
+  onExplanationToken?: (token: string) => void;
+  onDone?: (resultCount: number, provider: string) => void;
+}
+
 interface BackendErrorResponse {
   detail: ApiErrorDetail;
 }
@@ -35,8 +61,19 @@ interface BackendErrorResponse {
 export const chatService = {
   async getUserChats(userId: string): Promise<ChatItem[]> {
     try {
-      const response = await axios.get(`${API_BASE_URL}/user-chats/${userId}`);
-      return response.data.chats;
+      // Pages arrive newest first; follow the `before` cursor back to the oldest chat
+      let chats: ChatItem[] = [];
+      let before: string | null = null;
+      do {
+        const response: { data: UserChatsResponse } = await axios.get<UserChatsResponse>(
+          `${API_BASE_URL}/user-chats/${userId}`,
+          { params: { limit: HISTORY_PAGE_SIZE, ...(before ? { before } : {}) } }
+        );
+        const { chats: page, page: cursor } = response.data;
+        chats = [...page, ...chats];
+        before = cursor.has_more ? cursor.before : null;
+      } while (before);
+      return chats;
     } catch (error) {
       const parsedError = this.parseError(error);
       console.error("Failed to fetch user chats:", parsedError);
@@ -58,6 +95,76 @@ export const chatService = {
     }
   },
 
+  async streamMessage(
+    message: string,
+    handlers: StreamHandlers,
+    provider: string = DEFAULT_PROVIDER
+  ): Promise<void> {
+    const response = await fetch(
+      `${API_BASE_URL}/chat-with-db/stream?provider=${encodeURIComponent(provider)}`,
+      {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ message, conversation_id: null, provider }),
+      }
+    );
+
+    if (!response.ok || !response.body) {
+      throw {
+        error: "Network Error",
+        message: `Streaming request failed with status ${response.status}`,
+        resolution: "Please check your connection and try again",
+      } as ApiErrorDetail;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    // Server-sent events are separated by a blank line
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf("\n\n");
+      while (boundary !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf("\n\n");
+
+        let event = "message";
+        let data = "";
+        for (const line of rawEvent.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+        const payload = JSON.parse(data);
+
+        switch (event) {
+          case "sql_token":
+            handlers.onSqlToken?.(payload.token);
+            break;
+          case "sql":
+            handlers.onSql?.(payload.sql_query, payload.provider);
+            break;
+          case "rows":
+            handlers.onRows?.(payload.rows, payload.offset);
+            break;
+          case "explanation":
+            handlers.onExplanationToken?.(payload.token);
+            break;
+          case "done":
+            handlers.onDone?.(payload.result_count, payload.provider);
+            break;
+          case "error":
+            throw payload as ApiErrorDetail;
+        }
+      }
+    }
+  },
+
   parseError(error: unknown): ApiErrorDetail {
     // Handle Axios error with backend response
     if (axios.isAxiosError<BackendErrorResponse>(error)) {